@@ -1,4 +1,7 @@
 """Tools for generating supervisord/docker files for Rhasspy"""
+from __future__ import annotations
+
+import io
 import itertools
 import logging
 import os
@@ -8,203 +11,128 @@ import typing
 from pathlib import Path
 from urllib.parse import urljoin
 
-import yaml
-from rhasspyprofile import Profile
+if typing.TYPE_CHECKING:
+    # Only needed for type hints
+    from rhasspyprofile import Profile
+
+    # A profile, or the caching view of one used while generating a file
+    _AnyProfile = typing.Union[Profile, "_CachedProfile"]
 
 _LOGGER = logging.getLogger("rhasspysupervisor")
 
+# Fixed parts of ALSA commands (record 16Khz 16-bit mono raw, play WAV)
+_ARECORD_RECORD_COMMAND = "arecord -q -r 16000 -f S16_LE -c 1 -t raw"
+_ARECORD_LIST_COMMAND = "arecord -L"
+_ARECORD_TEST_COMMAND = "arecord -q -D {} -r 16000 -f S16_LE -c 1 -t raw"
+_APLAY_PLAY_COMMAND = "aplay -q -t wav"
+_APLAY_LIST_COMMAND = "aplay -L"
+
+# Fixed text to speech commands ({lang} and {file} are filled in by the service)
+_PICO2WAVE_TTS_COMMAND = "pico2wave -l {lang} -w {file}"
+_NANOTTS_TTS_COMMAND = "nanotts -v {lang} -o {file}"
+
+# Start of supervisord conf
+_SUPERVISORD_HEADER = "[supervisord]\nnodaemon=true\n\n"
+
+# Settings shared by every supervisord program
+_SUPERVISORD_BOILERPLATE = (
+    "stopasgroup=true\n"
+    "stdout_logfile=/dev/stdout\n"
+    "stdout_logfile_maxbytes=0\n"
+    "redirect_stderr=true\n"
+    "\n"
+)
+
+# (setting name, argument) for optional mqtt.tls settings
+_MQTT_TLS_ARGS = (
+    ("ca_certs", "--tls-ca-certs"),  # Certificate Authority certs
+    ("cert_reqs", "--tls-cert-reqs"),  # CERT_REQUIRED, CERT_OPTIONAL, CERT_NONE
+    ("certfile", "--tls-certfile"),  # PEM
+    ("keyfile", "--tls-keyfile"),
+    ("ciphers", "--tls-ciphers"),
+    ("version", "--tls-version"),
+)
+
+# (setting name, argument) for optional command.webrtcvad silence settings
+_WEBRTCVAD_ARGS = (
+    ("skip_sec", "--voice-skip-seconds"),
+    ("min_sec", "--voice-min-seconds"),
+    ("max_sec", "--voice-max-seconds"),
+    ("speech_sec", "--voice-speech-seconds"),
+    ("silence_sec", "--voice-silence-seconds"),
+    ("before_sec", "--voice-before-seconds"),
+    ("vad_mode", "--voice-sensitivity"),
+    ("silence_method", "--voice-silence-method"),
+    ("current_energy_threshold", "--voice-current-energy-threshold"),
+    ("max_energy", "--voice-max-energy"),
+    (
+        "max_current_energy_ratio_threshold",
+        "--voice-max-current-energy-ratio-threshold",
+    ),
+)
+
+# Line width for docker compose YAML (large enough to never wrap commands)
+_YAML_MAX_WIDTH = 2 ** 31 - 1
+
+# Systems that don't need a program/service of their own
+_DISABLED_SYSTEMS: typing.FrozenSet[str] = frozenset(("dummy", "hermes"))
+
+# (system type, description, function) for each program/service
+_SystemTable = typing.Tuple[typing.Tuple[str, str, typing.Callable[..., None]], ...]
+
+# System name -> function that gets its command, for each get_* dispatcher
+_CommandTable = typing.Dict[str, typing.Callable[..., typing.List[str]]]
+
 # -----------------------------------------------------------------------------
 # supervisord
 # -----------------------------------------------------------------------------
 
 
 def profile_to_conf(
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     local_mqtt_port=12183,
     mosquitto_path="mosquitto",
 ):
     """Generate supervisord conf from Rhasspy profile"""
+    # Settings like mqtt.tls.* are read once per program
+    profile = _CachedProfile(profile)
+
+    # Assembled in memory and written out all at once
+    conf_file = io.StringIO()
 
     # Header
-    print("[supervisord]", file=out_file)
-    print("nodaemon=true", file=out_file)
-    print("", file=out_file)
+    conf_file.write(_SUPERVISORD_HEADER)
 
     # MQTT
     master_site_ids = str(profile.get("mqtt.site_id", "default")).split(",")
 
-    mqtt_host = str(profile.get("mqtt.host", "localhost"))
-
-    try:
-        mqtt_port = int(profile.get("mqtt.port", 1883))
-    except ValueError:
-        mqtt_port = 1883
-
-    mqtt_username = str(profile.get("mqtt.username", "")).strip()
-    mqtt_password = str(profile.get("mqtt.password", "")).strip()
-
-    remote_mqtt = str(profile.get("mqtt.enabled", False)).lower() == "true"
+    mqtt_settings, remote_mqtt = get_mqtt_settings(
+        profile, local_mqtt_port, local_mqtt_host="localhost"
+    )
     if not remote_mqtt:
-        # Use internal broker (mosquitto) on custom port
-        mqtt_host = "localhost"
-        mqtt_port = local_mqtt_port
-        mqtt_username = ""
-        mqtt_password = ""
-        print_mqtt(out_file, mqtt_port=local_mqtt_port, mosquitto_path=mosquitto_path)
+        print_mqtt(conf_file, mqtt_port=local_mqtt_port, mosquitto_path=mosquitto_path)
 
     # -------------------------------------------------------------------------
 
-    # Microphone
-    mic_system = profile.get("microphone.system", "dummy")
-    if mic_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(
-            profile.get("microphone.satellite_site_ids", "")
-        ).split(",")
-        print_microphone(
-            mic_system,
-            profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Microphone disabled (system=%s)", mic_system)
-
-    # Speakers
-    sound_system = profile.get("sounds.system", "dummy")
-    if sound_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("sounds.satellite_site_ids", "")).split(
-            ","
-        )
-        print_speakers(
-            sound_system,
-            profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Speakers disabled (system=%s)", sound_system)
-
-    # Wake Word
-    wake_system = profile.get("wake.system", "dummy")
-    if wake_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("wake.satellite_site_ids", "")).split(",")
-        print_wake(
-            wake_system,
-            profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Wake word disabled (system=%s)", wake_system)
-
-    # Speech to Text
-    stt_system = profile.get("speech_to_text.system", "dummy")
-    if stt_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(
-            profile.get("speech_to_text.satellite_site_ids", "")
-        ).split(",")
-        print_speech_to_text(
-            stt_system,
-            profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Speech to text disabled (system=%s)", stt_system)
-
-    # Intent Recognition
-    intent_system = profile.get("intent.system", "dummy")
-    if intent_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("intent.satellite_site_ids", "")).split(
-            ","
-        )
-        print_intent_recognition(
-            intent_system,
-            profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Intent recognition disabled (system=%s)", intent_system)
-
-    # Intent Handling
-    handle_system = profile.get("handle.system", "dummy")
-    if handle_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("handle.satellite_site_ids", "")).split(
-            ","
-        )
-        print_intent_handling(
-            handle_system,
-            profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Intent handling disabled (system=%s)", handle_system)
+    for system_type, description, print_system in _SUPERVISORD_SYSTEMS:
+        system = profile.get(f"{system_type}.system", "dummy")
+        if system in _DISABLED_SYSTEMS:
+            _LOGGER.debug("%s disabled (system=%s)", description, system)
+            continue
 
-    # Text to Speech
-    tts_system = profile.get("text_to_speech.system", "dummy")
-    if tts_system not in {"dummy", "hermes"}:
         satellite_site_ids = str(
-            profile.get("text_to_speech.satellite_site_ids", "")
+            profile.get(f"{system_type}.satellite_site_ids", "")
         ).split(",")
-        print_text_to_speech(
-            tts_system,
-            profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Text to speech disabled (system=%s)", tts_system)
 
-    # Dialogue Management
-    dialogue_system = profile.get("dialogue.system", "dummy")
-    if dialogue_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("dialogue.satellite_site_ids", "")).split(
-            ","
-        )
-        print_dialogue(
-            dialogue_system,
-            profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            master_site_ids=master_site_ids,
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Dialogue disabled (system=%s)", dialogue_system)
+        site_ids = master_site_ids + satellite_site_ids
+        if system_type == "dialogue":
+            # Dialogue manager needs to know which site ids are the base station
+            print_system(
+                system, profile, conf_file, site_ids, master_site_ids, *mqtt_settings
+            )
+        else:
+            print_system(system, profile, conf_file, site_ids, *mqtt_settings)
 
     # Webhooks
     webhooks = profile.get("webhooks", {})
@@ -216,22 +144,17 @@ def profile_to_conf(
         print_webhooks(
             webhooks,
             profile,
-            out_file,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
+            conf_file,
+            master_site_ids + satellite_site_ids,
+            *mqtt_settings,
         )
 
+    out_file.write(conf_file.getvalue())
+
 
 def write_boilerplate(out_file: typing.TextIO):
     """Write boilerplate settings for supervisord service"""
-    print("stopasgroup=true", file=out_file)
-    print("stdout_logfile=/dev/stdout", file=out_file)
-    print("stdout_logfile_maxbytes=0", file=out_file)
-    print("redirect_stderr=true", file=out_file)
-    print("", file=out_file)
+    out_file.write(_SUPERVISORD_BOILERPLATE)
 
 
 # -----------------------------------------------------------------------------
@@ -242,11 +165,10 @@ def print_mqtt(out_file: typing.TextIO, mqtt_port: int, mosquitto_path="mosquitt
     mqtt_command = [mosquitto_path, "-p", str(mqtt_port)]
 
     if mqtt_command:
-        print("[program:mqtt]", file=out_file)
-        print("command=", " ".join(mqtt_command), sep="", file=out_file)
+        out_file.write(f"[program:mqtt]\ncommand={' '.join(mqtt_command)}\n")
 
         # Ensure broker starts first
-        print("priority=0", file=out_file)
+        out_file.write("priority=0\n")
 
         write_boilerplate(out_file)
 
@@ -255,7 +177,7 @@ def print_mqtt(out_file: typing.TextIO, mqtt_port: int, mosquitto_path="mosquitt
 
 
 def add_standard_args(
-    profile: Profile,
+    profile: _AnyProfile,
     command: typing.List[str],
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -264,63 +186,36 @@ def add_standard_args(
     mqtt_password: str = "",
 ):
     """Add typical MQTT arguments to a command."""
-    command.append("--debug")
-
-    command.extend(["--host", str(mqtt_host)])
-    command.extend(["--port", str(mqtt_port)])
+    command.extend(("--debug", "--host", str(mqtt_host), "--port", str(mqtt_port)))
 
     for site_id in site_ids:
         site_id = site_id.strip()
         if site_id:
-            command.extend(["--site-id", shlex.quote(str(site_id))])
+            command.extend(("--site-id", shlex.quote(site_id)))
 
     if mqtt_username:
-        command.extend(["--username", shlex.quote(str(mqtt_username))])
-        command.extend(["--password", shlex.quote(str(mqtt_password))])
+        command.extend(("--username", shlex.quote(str(mqtt_username))))
+        command.extend(("--password", shlex.quote(str(mqtt_password))))
 
     # TLS
-    tls_enabled = profile.get("mqtt.tls.enabled", False)
-    if tls_enabled:
+    if profile.get("mqtt.tls.enabled", False):
         command.append("--tls")
 
-        # Certificate Authority certs
-        tls_ca_certs = profile.get("mqtt.tls.ca_certs")
-        if tls_ca_certs:
-            command.extend(["--tls-ca-certs", shlex.quote(str(tls_ca_certs))])
-
-        # CERT_REQUIRED, CERT_OPTIONAL, CERT_NONE
-        tls_cert_reqs = profile.get("mqtt.tls.cert_reqs")
-        if tls_cert_reqs:
-            command.extend(["--tls-cert-reqs", shlex.quote(str(tls_cert_reqs))])
-
-        # PEM
-        tls_certfile = profile.get("mqtt.tls.certfile")
-        if tls_certfile:
-            command.extend(["--tls-certfile", shlex.quote(str(tls_certfile))])
-
-        tls_keyfile = profile.get("mqtt.tls.keyfile")
-        if tls_keyfile:
-            command.extend(["--tls-keyfile", shlex.quote(str(tls_keyfile))])
-
-        # Cipers/version
-        tls_ciphers = profile.get("mqtt.tls.ciphers")
-        if tls_ciphers:
-            command.extend(["--tls-ciphers", shlex.quote(str(tls_ciphers))])
-
-        tls_version = profile.get("mqtt.tls.version")
-        if tls_version:
-            command.extend(["--tls-version", shlex.quote(str(tls_version))])
+        for setting_name, tls_arg in _MQTT_TLS_ARGS:
+            setting_value = profile.get(f"mqtt.tls.{setting_name}")
+            if setting_value:
+                command.extend((tls_arg, shlex.quote(str(setting_value))))
 
     log_format = profile.get("logging.format", "")
     if log_format:
-        command.extend(["--log-format", shlex.quote(str(log_format))])
+        command.extend(("--log-format", shlex.quote(str(log_format))))
 
 
-def add_lang_args(profile: Profile, command: typing.List[str], system_type: str):
+def add_lang_args(profile: _AnyProfile, command: typing.List[str], system_type: str):
     """Add --lang to service for setting language in messages"""
     maybe_lang = profile.get(f"{system_type}.lang")
     if maybe_lang:
-        command.extend(["--lang", str(maybe_lang)])
+        command.extend(("--lang", str(maybe_lang)))
 
 
 # -----------------------------------------------------------------------------
@@ -328,197 +223,221 @@ def add_lang_args(profile: Profile, command: typing.List[str], system_type: str)
 # TODO: Add chunk sizes
 
 
-def get_microphone(
-    mic_system: str,
-    profile: Profile,
+def _get_microphone_arecord(
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
     mqtt_port: int = 1883,
     mqtt_username: str = "",
     mqtt_password: str = "",
 ) -> typing.List[str]:
-    """Get command for microphone system"""
-    if mic_system == "arecord":
-        record_command = [
-            "arecord",
-            "-q",
-            "-r",
-            "16000",
-            "-f",
-            "S16_LE",
-            "-c",
-            "1",
-            "-t",
-            "raw",
-        ]
-        list_command = ["arecord", "-L"]
-        test_command = "arecord -q -D {} -r 16000 -f S16_LE -c 1 -t raw"
-
-        mic_device = profile.get("microphone.arecord.device", "").strip()
-        if mic_device:
-            record_command.extend(["-D", str(mic_device)])
-
-        mic_command = [
-            "rhasspy-microphone-cli-hermes",
-            "--sample-rate",
-            "16000",
-            "--sample-width",
-            "2",
-            "--channels",
-            "1",
-            "--record-command",
-            shlex.quote(" ".join(record_command)),
-            "--list-command",
-            shlex.quote(" ".join(list_command)),
-            "--test-command",
-            shlex.quote(test_command),
-        ]
+    """Get command for ALSA arecord microphone system"""
+    arecord_command = _ARECORD_RECORD_COMMAND
+
+    mic_device = profile.get("microphone.arecord.device", "").strip()
+    if mic_device:
+        arecord_command += " -D " + str(mic_device)
+
+    mic_command = [
+        "rhasspy-microphone-cli-hermes",
+        "--sample-rate",
+        "16000",
+        "--sample-width",
+        "2",
+        "--channels",
+        "1",
+        "--record-command",
+        shlex.quote(arecord_command),
+        "--list-command",
+        shlex.quote(_ARECORD_LIST_COMMAND),
+        "--test-command",
+        shlex.quote(_ARECORD_TEST_COMMAND),
+    ]
 
-        add_standard_args(
-            profile,
-            mic_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        mic_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        udp_audio_host = profile.get("microphone.arecord.udp_audio_host", "127.0.0.1")
-        if udp_audio_host:
-            mic_command.extend(["--udp-audio-host", str(udp_audio_host)])
+    udp_audio_host = profile.get("microphone.arecord.udp_audio_host", "127.0.0.1")
+    if udp_audio_host:
+        mic_command.extend(("--udp-audio-host", str(udp_audio_host)))
 
-        udp_audio_port = profile.get("microphone.arecord.udp_audio_port", "")
-        if udp_audio_port:
-            mic_command.extend(["--udp-audio-port", str(udp_audio_port)])
+    udp_audio_port = profile.get("microphone.arecord.udp_audio_port", "")
+    if udp_audio_port:
+        mic_command.extend(("--udp-audio-port", str(udp_audio_port)))
 
-        output_site_id = profile.get("microphone.arecord.site_id", "")
-        if output_site_id:
-            mic_command.extend(["--output-site-id", shlex.quote(str(output_site_id))])
+    output_site_id = profile.get("microphone.arecord.site_id", "")
+    if output_site_id:
+        mic_command.extend(("--output-site-id", shlex.quote(str(output_site_id))))
 
-        return mic_command
+    return mic_command
 
-    if mic_system == "pyaudio":
-        mic_command = [
-            "rhasspy-microphone-pyaudio-hermes",
-            "--sample-rate",
-            "16000",
-            "--sample-width",
-            "2",
-            "--channels",
-            "1",
-        ]
 
-        add_standard_args(
-            profile,
-            mic_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+def _get_microphone_pyaudio(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for PyAudio microphone system"""
+    mic_command = [
+        "rhasspy-microphone-pyaudio-hermes",
+        "--sample-rate",
+        "16000",
+        "--sample-width",
+        "2",
+        "--channels",
+        "1",
+    ]
+
+    add_standard_args(
+        profile,
+        mic_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        mic_device = profile.get("microphone.pyaudio.device", "").strip()
-        if mic_device:
-            mic_command.extend(["--device-index", str(mic_device)])
+    mic_device = profile.get("microphone.pyaudio.device", "").strip()
+    if mic_device:
+        mic_command.extend(("--device-index", str(mic_device)))
 
-        output_site_id = profile.get("microphone.pyaudio.site_id", "")
-        if output_site_id:
-            mic_command.extend(["--output-site-id", shlex.quote(str(output_site_id))])
+    output_site_id = profile.get("microphone.pyaudio.site_id", "")
+    if output_site_id:
+        mic_command.extend(("--output-site-id", shlex.quote(str(output_site_id))))
 
-        udp_audio_host = profile.get("microphone.pyaudio.udp_audio_host", "127.0.0.1")
-        if udp_audio_host:
-            mic_command.extend(["--udp-audio-host", str(udp_audio_host)])
+    udp_audio_host = profile.get("microphone.pyaudio.udp_audio_host", "127.0.0.1")
+    if udp_audio_host:
+        mic_command.extend(("--udp-audio-host", str(udp_audio_host)))
 
-        udp_audio_port = profile.get("microphone.pyaudio.udp_audio_port", "")
-        if udp_audio_port:
-            mic_command.extend(["--udp-audio-port", str(udp_audio_port)])
+    udp_audio_port = profile.get("microphone.pyaudio.udp_audio_port", "")
+    if udp_audio_port:
+        mic_command.extend(("--udp-audio-port", str(udp_audio_port)))
 
-        frames_per_buffer = profile.get("microphone.pyaudio.frames_per_buffer")
-        if frames_per_buffer is not None:
-            mic_command.extend(["--frames-per-buffer", str(frames_per_buffer)])
+    frames_per_buffer = profile.get("microphone.pyaudio.frames_per_buffer")
+    if frames_per_buffer is not None:
+        mic_command.extend(("--frames-per-buffer", str(frames_per_buffer)))
 
-        return mic_command
+    return mic_command
 
-    if mic_system == "command":
-        # Command to record audio
-        record_program = profile.get("microphone.command.record_program")
-        if not record_program:
-            _LOGGER.error("microphone.command.record_program is required")
-            return []
 
-        record_command = [record_program] + command_args(
-            profile.get("microphone.command.record_arguments", [])
-        )
+def _get_microphone_command(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for external program microphone system"""
+    # Command to record audio
+    record_program = profile.get("microphone.command.record_program")
+    if not record_program:
+        _LOGGER.error("microphone.command.record_program is required")
+        return []
+
+    record_command = [record_program] + command_args(
+        profile.get("microphone.command.record_arguments", [])
+    )
 
-        sample_rate = int(profile.get("microphone.command.sample_rate", 16000))
-        sample_width = int(profile.get("microphone.command.sample_width", 2))
-        channels = int(profile.get("microphone.command.channels", 1))
-
-        mic_command = [
-            "rhasspy-microphone-cli-hermes",
-            "--sample-rate",
-            str(sample_rate),
-            "--sample-width",
-            str(sample_width),
-            "--channels",
-            str(channels),
-            "--record-command",
-            shlex.quote(" ".join(record_command)),
-        ]
+    sample_rate = int(profile.get("microphone.command.sample_rate", 16000))
+    sample_width = int(profile.get("microphone.command.sample_width", 2))
+    channels = int(profile.get("microphone.command.channels", 1))
+
+    mic_command = [
+        "rhasspy-microphone-cli-hermes",
+        "--sample-rate",
+        str(sample_rate),
+        "--sample-width",
+        str(sample_width),
+        "--channels",
+        str(channels),
+        "--record-command",
+        quote_command(record_command),
+    ]
 
-        add_standard_args(
-            profile,
-            mic_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
+    add_standard_args(
+        profile,
+        mic_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
+
+    # Command to list available audio input devices
+    list_program = profile.get("microphone.command.list_program")
+    if list_program:
+        list_command = [list_program] + profile.get(
+            "microphone.command.list_arguments", []
         )
+        mic_command.extend(("--list-command", quote_command(list_command)))
+    else:
+        _LOGGER.warning("No microphone device listing command provided.")
 
-        # Command to list available audio input devices
-        list_program = profile.get("microphone.command.list_program")
-        if list_program:
-            list_command = [list_program] + profile.get(
-                "microphone.command.list_arguments", []
-            )
-            mic_command.extend(
-                ["--list-command", shlex.quote(" ".join(str(v) for v in list_command))]
-            )
-        else:
-            _LOGGER.warning("No microphone device listing command provided.")
+    # Command to test available audio input devices
+    test_program = profile.get("microphone.command.test_program")
+    if test_program:
+        test_command = [test_program] + profile.get(
+            "microphone.command.test_arguments", []
+        )
+        mic_command.extend(("--test-command", quote_command(test_command)))
+    else:
+        _LOGGER.warning("No microphone device testing command provided.")
 
-        # Command to test available audio input devices
-        test_program = profile.get("microphone.command.test_program")
-        if test_program:
-            test_command = [test_program] + profile.get(
-                "microphone.command.test_arguments", []
-            )
-            mic_command.extend(
-                ["--test-command", shlex.quote(" ".join(str(v) for v in test_command))]
-            )
-        else:
-            _LOGGER.warning("No microphone device testing command provided.")
+    # UDP/output site_id
+    udp_audio_port = profile.get("microphone.command.udp_audio_port", "")
+    if udp_audio_port:
+        mic_command.extend(("--udp-audio-port", str(udp_audio_port)))
 
-        # UDP/output site_id
-        udp_audio_port = profile.get("microphone.command.udp_audio_port", "")
-        if udp_audio_port:
-            mic_command.extend(["--udp-audio-port", str(udp_audio_port)])
+    output_site_id = profile.get("microphone.command.site_id", "")
+    if output_site_id:
+        mic_command.extend(("--output-site-id", shlex.quote(str(output_site_id))))
 
-        output_site_id = profile.get("microphone.command.site_id", "")
-        if output_site_id:
-            mic_command.extend(["--output-site-id", shlex.quote(str(output_site_id))])
+    return mic_command
 
-        return mic_command
 
-    raise ValueError(f"Unsupported audio input system (got {mic_system})")
+# Microphone command for each audio input system
+_MICROPHONE_SYSTEMS: _CommandTable = {
+    "arecord": _get_microphone_arecord,
+    "pyaudio": _get_microphone_pyaudio,
+    "command": _get_microphone_command,
+}
+
+
+def get_microphone(
+    mic_system: str,
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for microphone system"""
+    get_system_command = _MICROPHONE_SYSTEMS.get(mic_system)
+    if get_system_command is None:
+        raise ValueError(f"Unsupported audio input system (got {mic_system})")
+
+    return get_system_command(
+        profile, site_ids, mqtt_host, mqtt_port, mqtt_username, mqtt_password
+    )
 
 
 def print_microphone(
     mic_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -538,367 +457,418 @@ def print_microphone(
     )
 
     if mic_command:
-        print("[program:microphone]", file=out_file)
-        print("command=", " ".join(mic_command), sep="", file=out_file)
+        out_file.write(f"[program:microphone]\ncommand={' '.join(mic_command)}\n")
         write_boilerplate(out_file)
 
 
 # -----------------------------------------------------------------------------
 
 
-def get_wake(
-    wake_system: str,
-    profile: Profile,
+def _get_wake_porcupine(
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
     mqtt_port: int = 1883,
     mqtt_username: str = "",
     mqtt_password: str = "",
 ) -> typing.List[str]:
-    """Get command for wake system"""
+    """Get command for Porcupine wake system"""
     wake_site_id = "default" if not site_ids else site_ids[0]
 
-    if wake_system == "porcupine":
-        keyword = profile.get("wake.porcupine.keyword_path") or "porcupine.ppn"
-        if not keyword:
-            _LOGGER.error("wake.porcupine.keyword_path required")
-            return []
-
-        sensitivity = profile.get("wake.porcupine.sensitivity", "0.5")
-        access_key = profile.get("wake.porcupine.access_key")
-
-        wake_command = [
-            "rhasspy-wake-porcupine-hermes",
-            "--keyword",
-            shlex.quote(str(keyword)),
-            "--sensitivity",
-            str(sensitivity),
-            "--access-key",
-            str(access_key),
-            "--keyword-dir",
-            shlex.quote(str(write_path(profile, "porcupine"))),
-        ]
+    keyword = profile.get("wake.porcupine.keyword_path") or "porcupine.ppn"
+    if not keyword:
+        _LOGGER.error("wake.porcupine.keyword_path required")
+        return []
+
+    sensitivity = profile.get("wake.porcupine.sensitivity", "0.5")
+    access_key = profile.get("wake.porcupine.access_key")
+
+    wake_command = [
+        "rhasspy-wake-porcupine-hermes",
+        "--keyword",
+        shlex.quote(str(keyword)),
+        "--sensitivity",
+        str(sensitivity),
+        "--access-key",
+        str(access_key),
+        "--keyword-dir",
+        quote_path(profile, "porcupine"),
+    ]
 
-        add_standard_args(
-            profile,
-            wake_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        wake_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Add --lang
-        add_lang_args(profile, wake_command, "wake")
+    # Add --lang
+    add_lang_args(profile, wake_command, "wake")
 
-        udp_audio = profile.get("wake.porcupine.udp_audio", "")
-        if udp_audio:
-            udp_site_info = profile.get("wake.porcupine.udp_site_info", {})
-            add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
+    udp_audio = profile.get("wake.porcupine.udp_audio", "")
+    if udp_audio:
+        udp_site_info = profile.get("wake.porcupine.udp_site_info", {})
+        add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
 
-        return wake_command
+    return wake_command
 
-    if wake_system == "snowboy":
-        wake_command = [
-            "rhasspy-wake-snowboy-hermes",
-            "--model-dir",
-            shlex.quote(str(write_path(profile, "snowboy"))),
-        ]
 
-        add_standard_args(
-            profile,
-            wake_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+def _get_wake_snowboy(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Snowboy wake system"""
+    wake_site_id = "default" if not site_ids else site_ids[0]
+
+    wake_command = [
+        "rhasspy-wake-snowboy-hermes",
+        "--model-dir",
+        quote_path(profile, "snowboy"),
+    ]
 
-        # Add --lang
-        add_lang_args(profile, wake_command, "wake")
+    add_standard_args(
+        profile,
+        wake_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        udp_audio = profile.get("wake.snowboy.udp_audio", "")
-        if udp_audio:
-            udp_site_info = profile.get("wake.snowboy.udp_site_info", {})
-            add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
+    # Add --lang
+    add_lang_args(profile, wake_command, "wake")
 
-        # Default settings
-        sensitivity = str(profile.get("wake.snowboy.sensitivity", "0.5"))
-        audio_gain = float(profile.get("wake.snowboy.audio_gain", "1.0"))
-        apply_frontend = bool(profile.get("wake.snowboy.apply_frontend", False))
+    udp_audio = profile.get("wake.snowboy.udp_audio", "")
+    if udp_audio:
+        udp_site_info = profile.get("wake.snowboy.udp_site_info", {})
+        add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
 
-        model_names: typing.List[str] = (
-            profile.get("wake.snowboy.model") or "snowboy.umdl"
-        ).split(",")
+    # Default settings
+    sensitivity = str(profile.get("wake.snowboy.sensitivity", "0.5"))
+    audio_gain = float(profile.get("wake.snowboy.audio_gain", "1.0"))
+    apply_frontend = bool(profile.get("wake.snowboy.apply_frontend", False))
 
-        model_settings: typing.Dict[str, typing.Dict[str, typing.Any]] = profile.get(
-            "wake.snowboy.model_settings", {}
-        )
+    model_names: typing.List[str] = (
+        profile.get("wake.snowboy.model") or "snowboy.umdl"
+    ).split(",")
 
-        for model_name in model_names:
-            # Add default settings
-            settings = model_settings.get(model_name, {})
-            if "sensitivity" not in settings:
-                settings["sensitivity"] = sensitivity
-
-            if "audio_gain" not in settings:
-                settings["audio_gain"] = audio_gain
-
-            if "apply_frontend" not in settings:
-                settings["apply_frontend"] = apply_frontend
-
-            model_args = [
-                shlex.quote(str(model_name)),
-                str(settings["sensitivity"]),
-                str(settings["audio_gain"]),
-                str(settings["apply_frontend"]),
-            ]
-            wake_command.extend(["--model"] + model_args)
-
-        return wake_command
-
-    if wake_system == "precise":
-        model = profile.get("wake.precise.model") or "hey-mycroft-2.pb"
-        if not model:
-            _LOGGER.error("wake.precise.model required")
-            return []
-
-        sensitivity = str(profile.get("wake.precise.sensitivity", 0.5)) or "0.5"
-        trigger_level = str(profile.get("wake.precise.trigger_level", 3)) or "3"
-
-        wake_command = [
-            "rhasspy-wake-precise-hermes",
-            "--model",
-            shlex.quote(str(model)),
-            "--sensitivity",
-            str(sensitivity),
-            "--trigger-level",
-            str(trigger_level),
-            "--model-dir",
-            shlex.quote(str(write_path(profile, "precise"))),
-        ]
+    model_settings: typing.Dict[str, typing.Dict[str, typing.Any]] = profile.get(
+        "wake.snowboy.model_settings", {}
+    )
 
-        add_standard_args(
-            profile,
-            wake_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
+    wake_command.extend(
+        snowboy_model_args(
+            model_names, model_settings, sensitivity, audio_gain, apply_frontend
         )
+    )
 
-        # Add --lang
-        add_lang_args(profile, wake_command, "wake")
+    return wake_command
 
-        udp_audio = profile.get("wake.precise.udp_audio", "")
-        if udp_audio:
-            udp_site_info = profile.get("wake.porcupine.udp_site_info", {})
-            add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
 
-        return wake_command
+def _get_wake_precise(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Mycroft Precise wake system"""
+    wake_site_id = "default" if not site_ids else site_ids[0]
 
-    if wake_system == "pocketsphinx":
-        # Load decoder settings (use speech-to-text configuration as a fallback)
-        acoustic_model = profile.get("wake.pocketsphinx.acoustic_model") or profile.get(
-            "speech_to_text.pocketsphinx.acoustic_model"
-        )
-        if not acoustic_model:
-            _LOGGER.error("acoustic model required")
-            return []
-
-        dictionaries = [
-            profile.get("wake.pocketsphinx.dictionary"),
-            profile.get("speech_to_text.pocketsphinx.base_dictionary"),
-            profile.get("speech_to_text.pocketsphinx.dictionary"),
-            profile.get("speech_to_text.pocketsphinx.custom_words"),
-        ]
-
-        wake_command = [
-            "rhasspy-wake-pocketsphinx-hermes",
-            "--keyphrase",
-            shlex.quote(str(profile.get("wake.pocketsphinx.keyphrase", "okay raspy"))),
-            "--keyphrase-threshold",
-            str(profile.get("wake.pocketsphinx.threshold", "1e-40")),
-            "--acoustic-model",
-            shlex.quote(str(write_path(profile, acoustic_model))),
-        ]
-
-        for dictionary in dictionaries:
-            if dictionary:
-                wake_command.extend(
-                    ["--dictionary", shlex.quote(str(write_path(profile, dictionary)))]
-                )
+    model = profile.get("wake.precise.model") or "hey-mycroft-2.pb"
+    if not model:
+        _LOGGER.error("wake.precise.model required")
+        return []
+
+    sensitivity = str(profile.get("wake.precise.sensitivity", 0.5)) or "0.5"
+    trigger_level = str(profile.get("wake.precise.trigger_level", 3)) or "3"
+
+    wake_command = [
+        "rhasspy-wake-precise-hermes",
+        "--model",
+        shlex.quote(str(model)),
+        "--sensitivity",
+        str(sensitivity),
+        "--trigger-level",
+        str(trigger_level),
+        "--model-dir",
+        quote_path(profile, "precise"),
+    ]
 
-        add_standard_args(
-            profile,
-            wake_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        wake_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Add --lang
-        add_lang_args(profile, wake_command, "wake")
+    # Add --lang
+    add_lang_args(profile, wake_command, "wake")
 
-        udp_audio = profile.get("wake.pocketsphinx.udp_audio", "")
-        if udp_audio:
-            udp_site_info = profile.get("wake.pocketsphinx.udp_site_info", {})
-            add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
+    udp_audio = profile.get("wake.precise.udp_audio", "")
+    if udp_audio:
+        udp_site_info = profile.get("wake.porcupine.udp_site_info", {})
+        add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
 
-        mllr_matrix = profile.get("wake.pocketsphinx.mllr_matrix")
-        if mllr_matrix:
-            wake_command.extend(
-                ["--mllr-matrix", shlex.quote(str(write_path(profile, mllr_matrix)))]
-            )
+    return wake_command
 
-        return wake_command
-
-    if wake_system == "raven":
-        wake_command = ["rhasspy-wake-raven-hermes"]
-
-        template_dir = profile.get("wake.raven.template_dir", "raven")
-        if not template_dir:
-            _LOGGER.error("wake.raven.template_dir is required")
-            return []
-
-        keywords = profile.get("wake.raven.keywords", {})
-
-        # Try to automatically detect keywords
-        keywords_dir = write_path(profile, template_dir)
-        if keywords_dir.is_dir():
-            for keyword_dir in keywords_dir.iterdir():
-                if keyword_dir.is_dir() and (keyword_dir.name not in keywords):
-                    keywords[keyword_dir.name] = {"enabled": True}
-
-        for keyword_dir_name, keyword_settings in keywords.items():
-            if not keyword_settings.get("enabled", True):
-                continue
-
-            # Exclude keywords whose directory doesn't exist
-            keyword_dir = keywords_dir / keyword_dir_name
-            if not keyword_dir.is_dir():
-                continue
-
-            # Add keyword as a directory relative to the template dir
-            wake_command.extend(
-                [
-                    "--keyword",
-                    shlex.quote(
-                        str(write_path(profile, template_dir, keyword_dir_name))
-                    ),
-                ]
-            )
 
-            # Override settings for specific keyword
-            for setting_name, setting_value in keyword_settings.items():
-                wake_command.append(shlex.quote(f"{setting_name}={setting_value}"))
+def _get_wake_pocketsphinx(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Pocketsphinx wake system"""
+    wake_site_id = "default" if not site_ids else site_ids[0]
 
-        probability_threshold = profile.get("wake.raven.probability_threshold")
-        if probability_threshold:
-            wake_command.extend(["--probability-threshold", str(probability_threshold)])
+    # Load decoder settings (use speech-to-text configuration as a fallback)
+    acoustic_model = profile.get("wake.pocketsphinx.acoustic_model") or profile.get(
+        "speech_to_text.pocketsphinx.acoustic_model"
+    )
+    if not acoustic_model:
+        _LOGGER.error("acoustic model required")
+        return []
+
+    dictionaries = [
+        profile.get("wake.pocketsphinx.dictionary"),
+        profile.get("speech_to_text.pocketsphinx.base_dictionary"),
+        profile.get("speech_to_text.pocketsphinx.dictionary"),
+        profile.get("speech_to_text.pocketsphinx.custom_words"),
+    ]
+
+    wake_command = [
+        "rhasspy-wake-pocketsphinx-hermes",
+        "--keyphrase",
+        shlex.quote(str(profile.get("wake.pocketsphinx.keyphrase", "okay raspy"))),
+        "--keyphrase-threshold",
+        str(profile.get("wake.pocketsphinx.threshold", "1e-40")),
+        "--acoustic-model",
+        quote_path(profile, acoustic_model),
+    ]
+
+    for dictionary in dictionaries:
+        if dictionary:
+            wake_command.extend(("--dictionary", quote_path(profile, dictionary)))
 
-        minimum_matches = profile.get("wake.raven.minimum_matches")
-        if minimum_matches:
-            wake_command.extend(["--minimum-matches", str(minimum_matches)])
+    add_standard_args(
+        profile,
+        wake_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        average_templates = profile.get("wake.raven.average_templates", True)
-        if average_templates:
-            wake_command.append("--average-templates")
+    # Add --lang
+    add_lang_args(profile, wake_command, "wake")
 
-        vad_sensitivity = profile.get("wake.raven.vad_sensitivity", 1)
-        if vad_sensitivity:
-            wake_command.extend(["--vad-sensitivity", str(vad_sensitivity)])
+    udp_audio = profile.get("wake.pocketsphinx.udp_audio", "")
+    if udp_audio:
+        udp_site_info = profile.get("wake.pocketsphinx.udp_site_info", {})
+        add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
 
-        # Positive examples
-        examples_dir = profile.get("wake.raven.examples_dir")
-        if examples_dir:
-            wake_command.extend(
-                ["--examples-dir", shlex.quote(str(write_path(profile, examples_dir)))]
-            )
+    mllr_matrix = profile.get("wake.pocketsphinx.mllr_matrix")
+    if mllr_matrix:
+        wake_command.extend(("--mllr-matrix", quote_path(profile, mllr_matrix)))
 
-        examples_format = profile.get("wake.raven.examples_format")
-        if examples_format:
-            wake_command.extend(
-                ["--examples-format", shlex.quote(str(examples_format))]
-            )
+    return wake_command
 
-        add_standard_args(
-            profile,
-            wake_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
 
-        # Add --lang
-        add_lang_args(profile, wake_command, "wake")
+def _get_wake_raven(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Raven wake system"""
+    wake_site_id = "default" if not site_ids else site_ids[0]
 
-        udp_audio = profile.get("wake.raven.udp_audio", "")
-        if udp_audio:
-            udp_site_info = profile.get("wake.pocketsphinx.udp_site_info", {})
-            add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
+    wake_command = ["rhasspy-wake-raven-hermes"]
 
-        return wake_command
+    template_dir = profile.get("wake.raven.template_dir", "raven")
+    if not template_dir:
+        _LOGGER.error("wake.raven.template_dir is required")
+        return []
 
-    if wake_system == "command":
-        user_program = profile.get("wake.command.program")
-        if not user_program:
-            _LOGGER.error("wake.command.program is required")
-            return []
+    keywords = profile.get("wake.raven.keywords", {})
 
-        user_command = [user_program] + command_args(
-            profile.get("wake.command.arguments", [])
-        )
+    # Try to automatically detect keywords
+    keywords_dir = write_path(profile, template_dir)
+    if keywords_dir.is_dir():
+        for keyword_dir in keywords_dir.iterdir():
+            if keyword_dir.is_dir() and (keyword_dir.name not in keywords):
+                keywords[keyword_dir.name] = {"enabled": True}
 
-        wake_command = [
-            "rhasspy-remote-http-hermes",
-            "--wake-command",
-            shlex.quote(" ".join(str(v) for v in user_command)),
-        ]
+    for keyword_dir_name, keyword_settings in keywords.items():
+        if not keyword_settings.get("enabled", True):
+            continue
 
-        add_standard_args(
-            profile,
-            wake_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
+        # Exclude keywords whose directory doesn't exist
+        keyword_dir = keywords_dir / keyword_dir_name
+        if not keyword_dir.is_dir():
+            continue
+
+        # Add keyword as a directory relative to the template dir
+        wake_command.extend(
+            ("--keyword", quote_path(profile, template_dir, keyword_dir_name))
         )
 
-        # Add --lang
-        add_lang_args(profile, wake_command, "wake")
+        # Override settings for specific keyword
+        for setting_name, setting_value in keyword_settings.items():
+            wake_command.append(shlex.quote(f"{setting_name}={setting_value}"))
+
+    probability_threshold = profile.get("wake.raven.probability_threshold")
+    if probability_threshold:
+        wake_command.extend(("--probability-threshold", str(probability_threshold)))
+
+    minimum_matches = profile.get("wake.raven.minimum_matches")
+    if minimum_matches:
+        wake_command.extend(("--minimum-matches", str(minimum_matches)))
+
+    average_templates = profile.get("wake.raven.average_templates", True)
+    if average_templates:
+        wake_command.append("--average-templates")
+
+    vad_sensitivity = profile.get("wake.raven.vad_sensitivity", 1)
+    if vad_sensitivity:
+        wake_command.extend(("--vad-sensitivity", str(vad_sensitivity)))
+
+    # Positive examples
+    examples_dir = profile.get("wake.raven.examples_dir")
+    if examples_dir:
+        wake_command.extend(("--examples-dir", quote_path(profile, examples_dir)))
+
+    examples_format = profile.get("wake.raven.examples_format")
+    if examples_format:
+        wake_command.extend(("--examples-format", shlex.quote(str(examples_format))))
+
+    add_standard_args(
+        profile,
+        wake_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
+
+    # Add --lang
+    add_lang_args(profile, wake_command, "wake")
+
+    udp_audio = profile.get("wake.raven.udp_audio", "")
+    if udp_audio:
+        udp_site_info = profile.get("wake.pocketsphinx.udp_site_info", {})
+        add_udp_audio_settings(wake_command, udp_audio, wake_site_id, udp_site_info)
+
+    return wake_command
+
+
+def _get_wake_command(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for external program wake system"""
+    user_program = profile.get("wake.command.program")
+    if not user_program:
+        _LOGGER.error("wake.command.program is required")
+        return []
+
+    user_command = [user_program] + command_args(
+        profile.get("wake.command.arguments", [])
+    )
+
+    wake_command = [
+        "rhasspy-remote-http-hermes",
+        "--wake-command",
+        quote_command(user_command),
+    ]
+
+    add_standard_args(
+        profile,
+        wake_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
+
+    # Add --lang
+    add_lang_args(profile, wake_command, "wake")
+
+    # Audio format
+    sample_rate = profile.get("wake.command.sample_rate")
+    if sample_rate:
+        wake_command.extend(("--wake-sample-rate", str(sample_rate)))
+
+    sample_width = profile.get("wake.command.sample_width")
+    if sample_width:
+        wake_command.extend(("--wake-sample-width", str(sample_width)))
 
-        # Audio format
-        sample_rate = profile.get("wake.command.sample_rate")
-        if sample_rate:
-            wake_command.extend(["--wake-sample-rate", str(sample_rate)])
+    channels = profile.get("wake.command.channels")
+    if channels:
+        wake_command.extend(("--wake-channels", str(channels)))
 
-        sample_width = profile.get("wake.command.sample_width")
-        if sample_width:
-            wake_command.extend(["--wake-sample-width", str(sample_width)])
+    add_ssl_args(wake_command, profile)
 
-        channels = profile.get("wake.command.channels")
-        if channels:
-            wake_command.extend(["--wake-channels", str(channels)])
+    return wake_command
 
-        add_ssl_args(wake_command, profile)
 
-        return wake_command
+# Wake command for each wake system
+_WAKE_SYSTEMS: _CommandTable = {
+    "porcupine": _get_wake_porcupine,
+    "snowboy": _get_wake_snowboy,
+    "precise": _get_wake_precise,
+    "pocketsphinx": _get_wake_pocketsphinx,
+    "raven": _get_wake_raven,
+    "command": _get_wake_command,
+}
 
-    raise ValueError(f"Unsupported wake system (got {wake_system})")
+
+def get_wake(
+    wake_system: str,
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for wake system"""
+    get_system_command = _WAKE_SYSTEMS.get(wake_system)
+    if get_system_command is None:
+        raise ValueError(f"Unsupported wake system (got {wake_system})")
+
+    return get_system_command(
+        profile, site_ids, mqtt_host, mqtt_port, mqtt_username, mqtt_password
+    )
 
 
 def print_wake(
     wake_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -918,11 +888,34 @@ def print_wake(
     )
 
     if wake_command:
-        print("[program:wake_word]", file=out_file)
-        print("command=", " ".join(wake_command), sep="", file=out_file)
+        out_file.write(f"[program:wake_word]\ncommand={' '.join(wake_command)}\n")
         write_boilerplate(out_file)
 
 
+def snowboy_model_args(
+    model_names: typing.Iterable[str],
+    model_settings: typing.Dict[str, typing.Dict[str, typing.Any]],
+    sensitivity: str,
+    audio_gain: float,
+    apply_frontend: bool,
+) -> typing.Iterable[str]:
+    """Generate --model arguments for snowboy, using defaults for missing settings."""
+    default_settings = {
+        "sensitivity": sensitivity,
+        "audio_gain": audio_gain,
+        "apply_frontend": apply_frontend,
+    }
+
+    for model_name in model_names:
+        settings = {**default_settings, **model_settings.get(model_name, {})}
+
+        yield "--model"
+        yield shlex.quote(model_name)
+        yield str(settings["sensitivity"])
+        yield str(settings["audio_gain"])
+        yield str(settings["apply_frontend"])
+
+
 def add_udp_audio_settings(
     command: typing.List[str],
     udp_audio: str,
@@ -955,614 +948,611 @@ def add_udp_audio_settings(
 
         # Add to command
         command.extend(
-            [
+            (
                 "--udp-audio",
                 shlex.quote(udp_host),
                 str(udp_port),
                 shlex.quote(udp_site_id),
-            ]
+            )
         )
 
         udp_site_info = udp_site_info or {}
         for udp_site_id, site_info in udp_site_info.items():
             if site_info.get("raw_audio", False):
                 # UDP audio is raw PCM instead of WAV chunks
-                command.extend(["--udp-raw-audio", str(udp_site_id)])
+                command.extend(("--udp-raw-audio", str(udp_site_id)))
 
             if site_info.get("forward_to_mqtt", False):
                 # UDP audio should be forwarded to MQTT after detection
-                command.extend(["--udp-forward-mqtt", str(udp_site_id)])
+                command.extend(("--udp-forward-mqtt", str(udp_site_id)))
 
 
 # -----------------------------------------------------------------------------
 
 
-def get_speech_to_text(
-    stt_system: str,
-    profile: Profile,
+def _get_speech_to_text_pocketsphinx(
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
     mqtt_port: int = 1883,
     mqtt_username: str = "",
     mqtt_password: str = "",
 ) -> typing.List[str]:
-    """Get command for speech to text system"""
-    if stt_system == "pocketsphinx":
-        # Pocketsphinx
-        acoustic_model = profile.get("speech_to_text.pocketsphinx.acoustic_model")
-        if not acoustic_model:
-            _LOGGER.error("speech_to_text.pocketsphinx.acoustic_model is required")
-            return []
-
-        # Open transcription
-        open_transcription = bool(
-            profile.get("speech_to_text.pocketsphinx.open_transcription", False)
-        )
-
-        if open_transcription:
-            dictionary = profile.get("speech_to_text.pocketsphinx.base_dictionary")
-            language_model = profile.get(
-                "speech_to_text.pocketsphinx.base_language_model"
-            )
-        else:
-            dictionary = profile.get("speech_to_text.pocketsphinx.dictionary")
-            language_model = profile.get("speech_to_text.pocketsphinx.language_model")
-
-        if not dictionary:
-            _LOGGER.error("Pocketsphinx dictionary is required")
-            return []
-
-        if not language_model:
-            _LOGGER.error("Pocketsphinx language model required")
-            return []
-
-        stt_command = [
-            "rhasspy-asr-pocketsphinx-hermes",
-            "--acoustic-model",
-            shlex.quote(str(write_path(profile, acoustic_model))),
-            "--dictionary",
-            shlex.quote(str(write_path(profile, dictionary))),
-            "--language-model",
-            shlex.quote(str(write_path(profile, language_model))),
-        ]
-
-        add_standard_args(
-            profile,
-            stt_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
-
-        # Add --lang
-        add_lang_args(profile, stt_command, "speech_to_text")
-
-        graph = profile.get("intent.fsticuffs.intent_graph")
-        if graph:
-            # Path to intent graph
-            stt_command.extend(
-                ["--intent-graph", shlex.quote(str(write_path(profile, graph)))]
-            )
-
-        if open_transcription:
-            # Don't overwrite dictionary or language model during training
-            stt_command.append("--no-overwrite-train")
-
-        base_dictionary = profile.get("speech_to_text.pocketsphinx.base_dictionary")
-        if base_dictionary:
-            stt_command.extend(
-                [
-                    "--base-dictionary",
-                    shlex.quote(str(write_path(profile, base_dictionary))),
-                ]
-            )
-
-        custom_words = profile.get("speech_to_text.pocketsphinx.custom_words")
-        if custom_words:
-            stt_command.extend(
-                [
-                    "--base-dictionary",
-                    shlex.quote(str(write_path(profile, custom_words))),
-                ]
-            )
+    """Get command for Pocketsphinx speech to text system"""
+    acoustic_model = profile.get("speech_to_text.pocketsphinx.acoustic_model")
+    if not acoustic_model:
+        _LOGGER.error("speech_to_text.pocketsphinx.acoustic_model is required")
+        return []
+
+    # Open transcription
+    open_transcription = bool(
+        profile.get("speech_to_text.pocketsphinx.open_transcription", False)
+    )
+    base_dictionary = profile.get("speech_to_text.pocketsphinx.base_dictionary")
 
-        # Case transformation for dictionary word
-        dictionary_casing = profile.get("speech_to_text.dictionary_casing")
-        if dictionary_casing:
-            stt_command.extend(["--dictionary-casing", dictionary_casing])
+    if open_transcription:
+        dictionary = base_dictionary
+        language_model = profile.get("speech_to_text.pocketsphinx.base_language_model")
+    else:
+        dictionary = profile.get("speech_to_text.pocketsphinx.dictionary")
+        language_model = profile.get("speech_to_text.pocketsphinx.language_model")
+
+    if not dictionary:
+        _LOGGER.error("Pocketsphinx dictionary is required")
+        return []
+
+    if not language_model:
+        _LOGGER.error("Pocketsphinx language model required")
+        return []
+
+    stt_command = [
+        "rhasspy-asr-pocketsphinx-hermes",
+        "--acoustic-model",
+        quote_path(profile, acoustic_model),
+        "--dictionary",
+        quote_path(profile, dictionary),
+        "--language-model",
+        quote_path(profile, language_model),
+    ]
 
-        # Grapheme-to-phoneme model
-        g2p_model = profile.get("speech_to_text.pocketsphinx.g2p_model")
-        if g2p_model:
-            stt_command.extend(
-                ["--g2p-model", shlex.quote(str(write_path(profile, g2p_model)))]
-            )
+    add_standard_args(
+        profile,
+        stt_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Case transformation for grapheme-to-phoneme model
-        g2p_casing = profile.get("speech_to_text.g2p_casing")
-        if g2p_casing:
-            stt_command.extend(["--g2p-casing", g2p_casing])
+    # Add --lang
+    add_lang_args(profile, stt_command, "speech_to_text")
 
-        # Path to write missing words and guessed pronunciations
-        unknown_words = profile.get("speech_to_text.pocketsphinx.unknown_words")
-        if unknown_words:
-            stt_command.extend(
-                [
-                    "--unknown-words",
-                    shlex.quote(str(write_path(profile, unknown_words))),
-                ]
-            )
+    graph = profile.get("intent.fsticuffs.intent_graph")
+    if graph:
+        # Path to intent graph
+        stt_command.extend(("--intent-graph", quote_path(profile, graph)))
 
-        # Mixed language model
-        base_lm_fst = profile.get("speech_to_text.pocketsphinx.base_language_model_fst")
-        if base_lm_fst:
-            stt_command.extend(
-                [
-                    "--base-language-model-fst",
-                    shlex.quote(str(write_path(profile, base_lm_fst))),
-                ]
-            )
+    if open_transcription:
+        # Don't overwrite dictionary or language model during training
+        stt_command.append("--no-overwrite-train")
 
-        base_lm_weight = str(profile.get("speech_to_text.pocketsphinx.mix_weight", ""))
-        if base_lm_weight:
-            stt_command.extend(["--base-language-model-weight", str(base_lm_weight)])
+    if base_dictionary:
+        stt_command.extend(("--base-dictionary", quote_path(profile, base_dictionary)))
 
-        mix_lm_fst = profile.get("speech_to_text.pocketsphinx.mix_fst")
-        if mix_lm_fst:
-            stt_command.extend(
-                [
-                    "--mixed-language-model-fst",
-                    shlex.quote(str(write_path(profile, mix_lm_fst))),
-                ]
-            )
+    custom_words = profile.get("speech_to_text.pocketsphinx.custom_words")
+    if custom_words:
+        stt_command.extend(("--base-dictionary", quote_path(profile, custom_words)))
 
-        # Silence detection
-        add_silence_args(stt_command, profile)
+    # Case transformation for dictionary word
+    dictionary_casing = profile.get("speech_to_text.dictionary_casing")
+    if dictionary_casing:
+        stt_command.extend(("--dictionary-casing", dictionary_casing))
 
-        return stt_command
+    # Grapheme-to-phoneme model
+    g2p_model = profile.get("speech_to_text.pocketsphinx.g2p_model")
+    if g2p_model:
+        stt_command.extend(("--g2p-model", quote_path(profile, g2p_model)))
 
-    if stt_system == "kaldi":
-        # Kaldi
-        model_dir = profile.get("speech_to_text.kaldi.model_dir")
-        if not model_dir:
-            _LOGGER.error("speech_to_text.kaldi.model_dir is required")
-            return []
+    # Case transformation for grapheme-to-phoneme model
+    g2p_casing = profile.get("speech_to_text.g2p_casing")
+    if g2p_casing:
+        stt_command.extend(("--g2p-casing", g2p_casing))
 
-        model_dir = write_path(profile, model_dir)
+    # Path to write missing words and guessed pronunciations
+    unknown_words = profile.get("speech_to_text.pocketsphinx.unknown_words")
+    if unknown_words:
+        stt_command.extend(("--unknown-words", quote_path(profile, unknown_words)))
 
-        # Open transcription
-        open_transcription = bool(
-            profile.get("speech_to_text.kaldi.open_transcription", False)
+    # Mixed language model
+    base_lm_fst = profile.get("speech_to_text.pocketsphinx.base_language_model_fst")
+    if base_lm_fst:
+        stt_command.extend(
+            ("--base-language-model-fst", quote_path(profile, base_lm_fst))
         )
 
-        if open_transcription:
-            graph = profile.get("speech_to_text.kaldi.base_graph")
-        else:
-            graph = profile.get("speech_to_text.kaldi.graph")
-
-        if not graph:
-            _LOGGER.error("Kaldi graph directory is required")
-            return []
-
-        graph = model_dir / graph
-
-        model_type = profile.get("speech_to_text.kaldi.model_type")
-        if not model_type:
-            _LOGGER.error("Kaldi model type is required")
-            return []
-
-        stt_command = [
-            "rhasspy-asr-kaldi-hermes",
-            "--model-type",
-            str(model_type),
-            "--model-dir",
-            shlex.quote(str(model_dir)),
-            "--graph-dir",
-            shlex.quote(str(graph)),
-        ]
-
-        # Spoken noise phone (SPN for <unk>)
-        spn_phone = profile.get("speech_to_text.kaldi.spn_phone")
-        if spn_phone:
-            stt_command.extend(["--spn-phone", str(spn_phone)])
+    base_lm_weight = str(profile.get("speech_to_text.pocketsphinx.mix_weight", ""))
+    if base_lm_weight:
+        stt_command.extend(("--base-language-model-weight", base_lm_weight))
 
-        add_standard_args(
-            profile,
-            stt_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
+    mix_lm_fst = profile.get("speech_to_text.pocketsphinx.mix_fst")
+    if mix_lm_fst:
+        stt_command.extend(
+            ("--mixed-language-model-fst", quote_path(profile, mix_lm_fst))
         )
 
-        # Add --lang
-        add_lang_args(profile, stt_command, "speech_to_text")
+    # Silence detection
+    add_silence_args(stt_command, profile)
 
-        if open_transcription:
-            # Don't overwrite HCLG.fst during training
-            stt_command.append("--no-overwrite-train")
-        else:
-            dictionary = profile.get("speech_to_text.kaldi.dictionary")
-            if dictionary:
-                stt_command.extend(
-                    ["--dictionary", shlex.quote(str(write_path(profile, dictionary)))]
-                )
+    return stt_command
 
-            language_model = profile.get("speech_to_text.kaldi.language_model")
-            if language_model:
-                stt_command.extend(
-                    [
-                        "--language-model",
-                        shlex.quote(str(write_path(profile, language_model))),
-                    ]
-                )
 
-            # ARPA or text FST (G.fst)
-            language_model_type = profile.get(
-                "speech_to_text.kaldi.language_model_type"
-            )
-            if language_model_type:
-                stt_command.extend(["--language-model-type", str(language_model_type)])
+def _get_speech_to_text_kaldi(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Kaldi speech to text system"""
+    model_dir = profile.get("speech_to_text.kaldi.model_dir")
+    if not model_dir:
+        _LOGGER.error("speech_to_text.kaldi.model_dir is required")
+        return []
 
-        base_dictionary = profile.get("speech_to_text.kaldi.base_dictionary")
-        if base_dictionary:
-            stt_command.extend(
-                [
-                    "--base-dictionary",
-                    shlex.quote(str(write_path(profile, base_dictionary))),
-                ]
-            )
+    model_dir = write_path(profile, model_dir)
 
-        custom_words = profile.get("speech_to_text.kaldi.custom_words")
-        if custom_words:
-            stt_command.extend(
-                [
-                    "--base-dictionary",
-                    shlex.quote(str(write_path(profile, custom_words))),
-                ]
-            )
+    # Open transcription
+    open_transcription = bool(
+        profile.get("speech_to_text.kaldi.open_transcription", False)
+    )
 
-        # Case transformation for dictionary word
-        dictionary_casing = profile.get("speech_to_text.dictionary_casing")
-        if dictionary_casing:
-            stt_command.extend(["--dictionary-casing", dictionary_casing])
+    if open_transcription:
+        graph = profile.get("speech_to_text.kaldi.base_graph")
+    else:
+        graph = profile.get("speech_to_text.kaldi.graph")
+
+    if not graph:
+        _LOGGER.error("Kaldi graph directory is required")
+        return []
+
+    graph = model_dir / graph
+
+    model_type = profile.get("speech_to_text.kaldi.model_type")
+    if not model_type:
+        _LOGGER.error("Kaldi model type is required")
+        return []
+
+    stt_command = [
+        "rhasspy-asr-kaldi-hermes",
+        "--model-type",
+        str(model_type),
+        "--model-dir",
+        shlex.quote(str(model_dir)),
+        "--graph-dir",
+        shlex.quote(str(graph)),
+    ]
+
+    # Spoken noise phone (SPN for <unk>)
+    spn_phone = profile.get("speech_to_text.kaldi.spn_phone")
+    if spn_phone:
+        stt_command.extend(("--spn-phone", str(spn_phone)))
 
-        # Grapheme-to-phoneme model
-        g2p_model = profile.get("speech_to_text.kaldi.g2p_model")
-        if g2p_model:
-            stt_command.extend(
-                ["--g2p-model", shlex.quote(str(write_path(profile, g2p_model)))]
-            )
+    add_standard_args(
+        profile,
+        stt_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Case transformation for grapheme-to-phoneme model
-        g2p_casing = profile.get("speech_to_text.g2p_casing")
-        if g2p_casing:
-            stt_command.extend(["--g2p-casing", g2p_casing])
+    # Add --lang
+    add_lang_args(profile, stt_command, "speech_to_text")
 
-        # Path to write missing words and guessed pronunciations
-        unknown_words = profile.get("speech_to_text.kaldi.unknown_words")
-        if unknown_words:
-            stt_command.extend(
-                [
-                    "--unknown-words",
-                    shlex.quote(str(write_path(profile, unknown_words))),
-                ]
-            )
+    if open_transcription:
+        # Don't overwrite HCLG.fst during training
+        stt_command.append("--no-overwrite-train")
+    else:
+        dictionary = profile.get("speech_to_text.kaldi.dictionary")
+        if dictionary:
+            stt_command.extend(("--dictionary", quote_path(profile, dictionary)))
 
-        # Mixed language model
-        base_lm_fst = profile.get("speech_to_text.kaldi.base_language_model_fst")
-        if base_lm_fst:
+        language_model = profile.get("speech_to_text.kaldi.language_model")
+        if language_model:
             stt_command.extend(
-                [
-                    "--base-language-model-fst",
-                    shlex.quote(str(write_path(profile, base_lm_fst))),
-                ]
+                ("--language-model", quote_path(profile, language_model))
             )
 
-        base_lm_weight = str(profile.get("speech_to_text.kaldi.mix_weight", ""))
-        if base_lm_weight:
-            stt_command.extend(["--base-language-model-weight", str(base_lm_weight)])
+        # ARPA or text FST (G.fst)
+        language_model_type = profile.get("speech_to_text.kaldi.language_model_type")
+        if language_model_type:
+            stt_command.extend(("--language-model-type", str(language_model_type)))
 
-        mix_lm_fst = profile.get("speech_to_text.kaldi.mix_fst")
-        if mix_lm_fst:
-            stt_command.extend(
-                [
-                    "--mixed-language-model-fst",
-                    shlex.quote(str(write_path(profile, mix_lm_fst))),
-                ]
-            )
+    base_dictionary = profile.get("speech_to_text.kaldi.base_dictionary")
+    if base_dictionary:
+        stt_command.extend(("--base-dictionary", quote_path(profile, base_dictionary)))
 
-        # Unknown words
-        frequent_words = profile.get("speech_to_text.kaldi.frequent_words")
-        if frequent_words:
-            stt_command.extend(
-                [
-                    "--frequent-words",
-                    shlex.quote(str(profile.read_path(frequent_words))),
-                ]
-            )
+    custom_words = profile.get("speech_to_text.kaldi.custom_words")
+    if custom_words:
+        stt_command.extend(("--base-dictionary", quote_path(profile, custom_words)))
 
-        max_frequent_words = profile.get("speech_to_text.kaldi.max_frequent_words")
-        if max_frequent_words:
-            stt_command.extend(
-                ["--max-frequent-words", shlex.quote(str(max_frequent_words))]
-            )
+    # Case transformation for dictionary word
+    dictionary_casing = profile.get("speech_to_text.dictionary_casing")
+    if dictionary_casing:
+        stt_command.extend(("--dictionary-casing", dictionary_casing))
 
-        max_unknown_words = profile.get("speech_to_text.kaldi.max_unknown_words")
-        if max_unknown_words:
-            stt_command.extend(
-                ["--max-unknown-words", shlex.quote(str(max_unknown_words))]
-            )
+    # Grapheme-to-phoneme model
+    g2p_model = profile.get("speech_to_text.kaldi.g2p_model")
+    if g2p_model:
+        stt_command.extend(("--g2p-model", quote_path(profile, g2p_model)))
 
-        if profile.get("speech_to_text.kaldi.allow_unknown_words", False):
-            stt_command.append("--allow-unknown-words")
+    # Case transformation for grapheme-to-phoneme model
+    g2p_casing = profile.get("speech_to_text.g2p_casing")
+    if g2p_casing:
+        stt_command.extend(("--g2p-casing", g2p_casing))
 
-        unknown_words_probability = profile.get(
-            "speech_to_text.kaldi.unknown_words_probability"
+    # Path to write missing words and guessed pronunciations
+    unknown_words = profile.get("speech_to_text.kaldi.unknown_words")
+    if unknown_words:
+        stt_command.extend(("--unknown-words", quote_path(profile, unknown_words)))
+
+    # Mixed language model
+    base_lm_fst = profile.get("speech_to_text.kaldi.base_language_model_fst")
+    if base_lm_fst:
+        stt_command.extend(
+            ("--base-language-model-fst", quote_path(profile, base_lm_fst))
         )
-        if unknown_words_probability is not None:
-            stt_command.extend(
-                [
-                    "--unknown-words-probability",
-                    shlex.quote(str(unknown_words_probability)),
-                ]
-            )
 
-        unknown_token = profile.get("speech_to_text.kaldi.unknown_token")
-        if unknown_token is not None:
-            stt_command.extend(["--unknown-token", shlex.quote(str(unknown_token))])
+    base_lm_weight = str(profile.get("speech_to_text.kaldi.mix_weight", ""))
+    if base_lm_weight:
+        stt_command.extend(("--base-language-model-weight", base_lm_weight))
 
-        silence_probability = profile.get("speech_to_text.kaldi.silence_probability")
-        if silence_probability is not None:
-            stt_command.extend(
-                ["--silence-probability", shlex.quote(str(silence_probability))]
-            )
+    mix_lm_fst = profile.get("speech_to_text.kaldi.mix_fst")
+    if mix_lm_fst:
+        stt_command.extend(
+            ("--mixed-language-model-fst", quote_path(profile, mix_lm_fst))
+        )
 
-        cancel_word = profile.get("speech_to_text.kaldi.cancel_word")
-        if cancel_word is not None:
-            stt_command.extend(["--cancel-word", shlex.quote(str(cancel_word))])
+    # Unknown words
+    frequent_words = profile.get("speech_to_text.kaldi.frequent_words")
+    if frequent_words:
+        stt_command.extend(
+            ("--frequent-words", shlex.quote(str(profile.read_path(frequent_words))))
+        )
 
-        cancel_probability = profile.get("speech_to_text.kaldi.cancel_probability")
-        if cancel_probability is not None:
-            stt_command.extend(
-                ["--cancel-probability", shlex.quote(str(cancel_probability))]
-            )
+    max_frequent_words = profile.get("speech_to_text.kaldi.max_frequent_words")
+    if max_frequent_words:
+        stt_command.extend(
+            ("--max-frequent-words", shlex.quote(str(max_frequent_words)))
+        )
 
-        # Silence detection
-        add_silence_args(stt_command, profile)
+    max_unknown_words = profile.get("speech_to_text.kaldi.max_unknown_words")
+    if max_unknown_words:
+        stt_command.extend(("--max-unknown-words", shlex.quote(str(max_unknown_words))))
 
-        return stt_command
+    if profile.get("speech_to_text.kaldi.allow_unknown_words", False):
+        stt_command.append("--allow-unknown-words")
 
-    if stt_system == "vosk":
-        # Vosk
-        model_dir = profile.get("speech_to_text.vosk.model_dir")
-        if not model_dir:
-            _LOGGER.error("speech_to_text.vosk.model_dir is required")
-            return []
+    unknown_words_probability = profile.get(
+        "speech_to_text.kaldi.unknown_words_probability"
+    )
+    if unknown_words_probability is not None:
+        stt_command.extend(
+            (
+                "--unknown-words-probability",
+                shlex.quote(str(unknown_words_probability)),
+            )
+        )
 
-        model_dir = write_path(profile, model_dir)
+    unknown_token = profile.get("speech_to_text.kaldi.unknown_token")
+    if unknown_token is not None:
+        stt_command.extend(("--unknown-token", shlex.quote(str(unknown_token))))
 
-        # Open transcription
-        open_transcription = bool(
-            profile.get("speech_to_text.vosk.open_transcription", False)
+    silence_probability = profile.get("speech_to_text.kaldi.silence_probability")
+    if silence_probability is not None:
+        stt_command.extend(
+            ("--silence-probability", shlex.quote(str(silence_probability)))
         )
 
-        stt_command = ["rhasspy-asr-vosk-hermes", "--model", str(model_dir)]
-
-        if open_transcription:
-            # Don't overwrite words JSON during training
-            stt_command.append("--no-overwrite-train")
-        else:
-            # Create lists of valid words from training sentences
-            words_json_path = profile.get(
-                "speech_to_text.vosk.words_json", "vosk/words.json"
-            )
-            stt_command.extend(
-                ["--words-json", shlex.quote(str(write_path(profile, words_json_path)))]
-            )
+    cancel_word = profile.get("speech_to_text.kaldi.cancel_word")
+    if cancel_word is not None:
+        stt_command.extend(("--cancel-word", shlex.quote(str(cancel_word))))
 
-        add_standard_args(
-            profile,
-            stt_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
+    cancel_probability = profile.get("speech_to_text.kaldi.cancel_probability")
+    if cancel_probability is not None:
+        stt_command.extend(
+            ("--cancel-probability", shlex.quote(str(cancel_probability)))
         )
 
-        # Add --lang
-        add_lang_args(profile, stt_command, "speech_to_text")
+    # Silence detection
+    add_silence_args(stt_command, profile)
 
-        return stt_command
+    return stt_command
 
-    if stt_system == "command":
-        user_program = profile.get("speech_to_text.command.program")
-        if not user_program:
-            _LOGGER.error("speech_to_text.command.program is required")
-            return []
 
-        user_command = [user_program] + command_args(
-            profile.get("speech_to_text.command.arguments", [])
-        )
+def _get_speech_to_text_vosk(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Vosk speech to text system"""
+    # Vosk
+    model_dir = profile.get("speech_to_text.vosk.model_dir")
+    if not model_dir:
+        _LOGGER.error("speech_to_text.vosk.model_dir is required")
+        return []
+
+    model_dir = write_path(profile, model_dir)
+
+    # Open transcription
+    open_transcription = bool(
+        profile.get("speech_to_text.vosk.open_transcription", False)
+    )
 
-        stt_command = [
-            "rhasspy-remote-http-hermes",
-            "--asr-command",
-            shlex.quote(" ".join(str(v) for v in user_command)),
-        ]
+    stt_command = ["rhasspy-asr-vosk-hermes", "--model", str(model_dir)]
 
-        add_standard_args(
-            profile,
-            stt_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
+    if open_transcription:
+        # Don't overwrite words JSON during training
+        stt_command.append("--no-overwrite-train")
+    else:
+        # Create lists of valid words from training sentences
+        words_json_path = profile.get(
+            "speech_to_text.vosk.words_json", "vosk/words.json"
         )
+        stt_command.extend(("--words-json", quote_path(profile, words_json_path)))
 
-        # Add --lang
-        add_lang_args(profile, stt_command, "speech_to_text")
+    add_standard_args(
+        profile,
+        stt_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        add_ssl_args(stt_command, profile)
+    # Add --lang
+    add_lang_args(profile, stt_command, "speech_to_text")
 
-        # Training
-        stt_train_system = profile.get("training.speech_to_text.system", "auto")
-        if stt_train_system == "auto":
-            train_url = profile.get("training.speech_to_text.remote.url")
-            if train_url:
-                stt_command.extend(["--asr-train-url", shlex.quote(train_url)])
-            else:
-                _LOGGER.warning("No speech to text training URL was provided")
+    return stt_command
 
-        return stt_command
 
-    if stt_system == "remote":
-        url = profile.get("speech_to_text.remote.url")
-        if not url:
-            _LOGGER.error("speech_to_text.remote.url is required")
-            return []
+def _get_speech_to_text_command(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for external program speech to text system"""
+    user_program = profile.get("speech_to_text.command.program")
+    if not user_program:
+        _LOGGER.error("speech_to_text.command.program is required")
+        return []
+
+    user_command = [user_program] + command_args(
+        profile.get("speech_to_text.command.arguments", [])
+    )
 
-        stt_command = ["rhasspy-remote-http-hermes", "--asr-url", shlex.quote(url)]
+    stt_command = [
+        "rhasspy-remote-http-hermes",
+        "--asr-command",
+        quote_command(user_command),
+    ]
 
-        add_standard_args(
-            profile,
-            stt_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        stt_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Add --lang
-        add_lang_args(profile, stt_command, "speech_to_text")
+    # Add --lang
+    add_lang_args(profile, stt_command, "speech_to_text")
 
-        add_ssl_args(stt_command, profile)
+    add_ssl_args(stt_command, profile)
 
-        # Training
-        stt_train_system = profile.get("training.speech_to_text.system", "auto")
-        if stt_train_system == "auto":
-            train_url = profile.get("training.speech_to_text.remote.url")
-            if train_url:
-                stt_command.extend(["--asr-train-url", shlex.quote(str(train_url))])
-            else:
-                _LOGGER.warning("No speech to text training URL was provided")
+    # Training
+    stt_train_system = profile.get("training.speech_to_text.system", "auto")
+    if stt_train_system == "auto":
+        train_url = profile.get("training.speech_to_text.remote.url")
+        if train_url:
+            stt_command.extend(("--asr-train-url", shlex.quote(train_url)))
+        else:
+            _LOGGER.warning("No speech to text training URL was provided")
 
-        # Silence detection
-        add_silence_args(stt_command, profile)
+    return stt_command
 
-        return stt_command
 
-    if stt_system == "deepspeech":
-        # DeepSpeech
-        acoustic_model = profile.get("speech_to_text.deepspeech.acoustic_model")
-        if not acoustic_model:
-            _LOGGER.error("speech_to_text.deepspeech.acoustic_model is required")
-            return []
+def _get_speech_to_text_remote(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for remote HTTP speech to text system"""
+    url = profile.get("speech_to_text.remote.url")
+    if not url:
+        _LOGGER.error("speech_to_text.remote.url is required")
+        return []
 
-        # Open transcription
-        open_transcription = bool(
-            profile.get("speech_to_text.deepspeech.open_transcription", False)
-        )
+    stt_command = ["rhasspy-remote-http-hermes", "--asr-url", shlex.quote(url)]
 
-        if open_transcription:
-            language_model = profile.get(
-                "speech_to_text.deepspeech.base_language_model"
-            )
-            scorer = profile.get("speech_to_text.deepspeech.base_scorer")
-        else:
-            language_model = profile.get("speech_to_text.deepspeech.language_model")
-            scorer = profile.get("speech_to_text.deepspeech.scorer")
-
-        if not language_model:
-            _LOGGER.error("DeepSpeech language model required")
-            return []
-
-        if not scorer:
-            _LOGGER.error("DeepSpeech scorer is required")
-            return []
-
-        alphabet = profile.get("speech_to_text.deepspeech.alphabet")
-        if not alphabet:
-            _LOGGER.error("DeepSpeech alphabet is required")
-            return []
-
-        stt_command = [
-            "rhasspy-asr-deepspeech-hermes",
-            "--model",
-            shlex.quote(str(write_path(profile, acoustic_model))),
-            "--language-model",
-            shlex.quote(str(write_path(profile, language_model))),
-            "--scorer",
-            shlex.quote(str(write_path(profile, scorer))),
-            "--alphabet",
-            shlex.quote(str(write_path(profile, alphabet))),
-        ]
+    add_standard_args(
+        profile,
+        stt_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        add_standard_args(
-            profile,
-            stt_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
+    # Add --lang
+    add_lang_args(profile, stt_command, "speech_to_text")
+
+    add_ssl_args(stt_command, profile)
+
+    # Training
+    stt_train_system = profile.get("training.speech_to_text.system", "auto")
+    if stt_train_system == "auto":
+        train_url = profile.get("training.speech_to_text.remote.url")
+        if train_url:
+            stt_command.extend(("--asr-train-url", shlex.quote(str(train_url))))
+        else:
+            _LOGGER.warning("No speech to text training URL was provided")
+
+    # Silence detection
+    add_silence_args(stt_command, profile)
+
+    return stt_command
+
+
+def _get_speech_to_text_deepspeech(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Mozilla DeepSpeech speech to text system"""
+    # DeepSpeech
+    acoustic_model = profile.get("speech_to_text.deepspeech.acoustic_model")
+    if not acoustic_model:
+        _LOGGER.error("speech_to_text.deepspeech.acoustic_model is required")
+        return []
+
+    # Open transcription
+    open_transcription = bool(
+        profile.get("speech_to_text.deepspeech.open_transcription", False)
+    )
+
+    if open_transcription:
+        language_model = profile.get("speech_to_text.deepspeech.base_language_model")
+        scorer = profile.get("speech_to_text.deepspeech.base_scorer")
+    else:
+        language_model = profile.get("speech_to_text.deepspeech.language_model")
+        scorer = profile.get("speech_to_text.deepspeech.scorer")
+
+    if not language_model:
+        _LOGGER.error("DeepSpeech language model required")
+        return []
+
+    if not scorer:
+        _LOGGER.error("DeepSpeech scorer is required")
+        return []
+
+    alphabet = profile.get("speech_to_text.deepspeech.alphabet")
+    if not alphabet:
+        _LOGGER.error("DeepSpeech alphabet is required")
+        return []
+
+    stt_command = [
+        "rhasspy-asr-deepspeech-hermes",
+        "--model",
+        quote_path(profile, acoustic_model),
+        "--language-model",
+        quote_path(profile, language_model),
+        "--scorer",
+        quote_path(profile, scorer),
+        "--alphabet",
+        quote_path(profile, alphabet),
+    ]
+
+    add_standard_args(
+        profile,
+        stt_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
+
+    # Add --lang
+    add_lang_args(profile, stt_command, "speech_to_text")
+
+    if open_transcription:
+        # Don't overwrite dictionary or language model during training
+        stt_command.append("--no-overwrite-train")
+
+    # Mixed language model
+    base_lm_fst = profile.get("speech_to_text.deepspeech.base_language_model_fst")
+    if base_lm_fst:
+        stt_command.extend(
+            ("--base-language-model-fst", quote_path(profile, base_lm_fst))
         )
 
-        # Add --lang
-        add_lang_args(profile, stt_command, "speech_to_text")
+    base_lm_weight = str(profile.get("speech_to_text.deepspeech.mix_weight", ""))
+    if base_lm_weight:
+        stt_command.extend(("--base-language-model-weight", base_lm_weight))
 
-        if open_transcription:
-            # Don't overwrite dictionary or language model during training
-            stt_command.append("--no-overwrite-train")
+    mix_lm_fst = profile.get("speech_to_text.deepspeech.mix_fst")
+    if mix_lm_fst:
+        stt_command.extend(
+            ("--mixed-language-model-fst", quote_path(profile, mix_lm_fst))
+        )
 
-        # Mixed language model
-        base_lm_fst = profile.get("speech_to_text.deepspeech.base_language_model_fst")
-        if base_lm_fst:
-            stt_command.extend(
-                [
-                    "--base-language-model-fst",
-                    shlex.quote(str(write_path(profile, base_lm_fst))),
-                ]
-            )
+    lm_alpha = str(profile.get("speech_to_text.deepspeech.lm_alpha", ""))
+    if lm_alpha:
+        stt_command.extend(("--lm-alpha", lm_alpha))
 
-        base_lm_weight = str(profile.get("speech_to_text.deepspeech.mix_weight", ""))
-        if base_lm_weight:
-            stt_command.extend(["--base-language-model-weight", str(base_lm_weight)])
+    lm_beta = str(profile.get("speech_to_text.deepspeech.lm_beta", ""))
+    if lm_beta:
+        stt_command.extend(("--lm-beta", lm_beta))
 
-        mix_lm_fst = profile.get("speech_to_text.deepspeech.mix_fst")
-        if mix_lm_fst:
-            stt_command.extend(
-                [
-                    "--mixed-language-model-fst",
-                    shlex.quote(str(write_path(profile, mix_lm_fst))),
-                ]
-            )
+    # Silence detection
+    add_silence_args(stt_command, profile)
+
+    return stt_command
 
-        lm_alpha = str(profile.get("speech_to_text.deepspeech.lm_alpha", ""))
-        if lm_alpha:
-            stt_command.extend(["--lm-alpha", lm_alpha])
 
-        lm_beta = str(profile.get("speech_to_text.deepspeech.lm_beta", ""))
-        if lm_beta:
-            stt_command.extend(["--lm-beta", lm_beta])
+# Speech to text command for each speech to text system
+_SPEECH_TO_TEXT_SYSTEMS: _CommandTable = {
+    "pocketsphinx": _get_speech_to_text_pocketsphinx,
+    "kaldi": _get_speech_to_text_kaldi,
+    "vosk": _get_speech_to_text_vosk,
+    "command": _get_speech_to_text_command,
+    "remote": _get_speech_to_text_remote,
+    "deepspeech": _get_speech_to_text_deepspeech,
+}
 
-        # Silence detection
-        add_silence_args(stt_command, profile)
 
-        return stt_command
+def get_speech_to_text(
+    stt_system: str,
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for speech to text system"""
+    get_system_command = _SPEECH_TO_TEXT_SYSTEMS.get(stt_system)
+    if get_system_command is None:
+        raise ValueError(f"Unsupported speech to text system (got {stt_system})")
 
-    raise ValueError(f"Unsupported speech to text system (got {stt_system})")
+    return get_system_command(
+        profile, site_ids, mqtt_host, mqtt_port, mqtt_username, mqtt_password
+    )
 
 
 def print_speech_to_text(
     stt_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -1582,8 +1572,7 @@ def print_speech_to_text(
     )
 
     if stt_command:
-        print("[program:speech_to_text]", file=out_file)
-        print("command=", " ".join(stt_command), sep="", file=out_file)
+        out_file.write(f"[program:speech_to_text]\ncommand={' '.join(stt_command)}\n")
         write_boilerplate(out_file)
 
 
@@ -1592,324 +1581,388 @@ def print_speech_to_text(
 # TODO: Add support for adapt, flair
 
 
-def get_intent_recognition(
-    intent_system: str,
-    profile: Profile,
+def _get_intent_recognition_fsticuffs(
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
     mqtt_port: int = 1883,
     mqtt_username: str = "",
     mqtt_password: str = "",
 ) -> typing.List[str]:
-    """Get command for intent recognition system"""
+    """Get command for fsticuffs intent recognition system"""
     dictionary_casing = profile.get("speech_to_text.dictionary_casing")
 
-    if intent_system == "fsticuffs":
-        graph = profile.get("intent.fsticuffs.intent_graph")
-        if not graph:
-            _LOGGER.error("intent.fsticuffs.intent_graph is required")
-            return []
+    graph = profile.get("intent.fsticuffs.intent_graph")
+    if not graph:
+        _LOGGER.error("intent.fsticuffs.intent_graph is required")
+        return []
 
-        intent_command = [
-            "rhasspy-nlu-hermes",
-            "--intent-graph",
-            shlex.quote(str(write_path(profile, graph))),
-        ]
+    intent_command = [
+        "rhasspy-nlu-hermes",
+        "--intent-graph",
+        quote_path(profile, graph),
+    ]
 
-        add_standard_args(
-            profile,
-            intent_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        intent_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Add --lang
-        add_lang_args(profile, intent_command, "intent")
+    # Add --lang
+    add_lang_args(profile, intent_command, "intent")
 
-        fuzzy = profile.get("intent.fsticuffs.fuzzy", True)
-        if not fuzzy:
-            intent_command.append("--no-fuzzy")
+    fuzzy = profile.get("intent.fsticuffs.fuzzy", True)
+    if not fuzzy:
+        intent_command.append("--no-fuzzy")
 
-        replace_numbers = profile.get("intent.replace_numbers", True)
-        if replace_numbers:
-            intent_command.append("--replace-numbers")
+    replace_numbers = profile.get("intent.replace_numbers", True)
+    if replace_numbers:
+        intent_command.append("--replace-numbers")
 
-            locale = profile.get("locale")
-            if locale:
-                intent_command.extend(["--language", str(locale)])
+        locale = profile.get("locale")
+        if locale:
+            intent_command.extend(("--language", str(locale)))
 
-        # Case transformation
-        if dictionary_casing:
-            intent_command.extend(["--casing", dictionary_casing])
+    # Case transformation
+    if dictionary_casing:
+        intent_command.extend(("--casing", dictionary_casing))
 
-        # Directory with custom converter scripts
-        converters_dir = profile.get("intent.fsticuffs.converters_dir", "converters")
-        intent_command.extend(
-            ["--converters-dir", shlex.quote(str(write_path(profile, converters_dir)))]
-        )
+    # Directory with custom converter scripts
+    converters_dir = profile.get("intent.fsticuffs.converters_dir", "converters")
+    intent_command.extend(("--converters-dir", quote_path(profile, converters_dir)))
 
-        failure_token = profile.get("intent.fsticuffs.failure_token", "<unk>")
-        if failure_token:
-            intent_command.extend(["--failure-token", str(failure_token)])
+    failure_token = profile.get("intent.fsticuffs.failure_token", "<unk>")
+    if failure_token:
+        intent_command.extend(("--failure-token", str(failure_token)))
 
-        return intent_command
+    return intent_command
 
-    if intent_system == "fuzzywuzzy":
-        graph = profile.get("intent.fsticuffs.intent_graph")
-        if not graph:
-            _LOGGER.error("intent.fsticuffs.intent_graph is required")
-            return []
 
-        examples = profile.get("intent.fuzzywuzzy.examples_json")
-        if not examples:
-            _LOGGER.error("intent.fuzzywuzzy.examples_json is required")
-            return []
+def _get_intent_recognition_fuzzywuzzy(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for fuzzywuzzy intent recognition system"""
+    dictionary_casing = profile.get("speech_to_text.dictionary_casing")
 
-        intent_command = [
-            "rhasspy-fuzzywuzzy-hermes",
-            "--intent-graph",
-            shlex.quote(str(write_path(profile, graph))),
-            "--examples",
-            shlex.quote(str(write_path(profile, examples))),
-        ]
+    graph = profile.get("intent.fsticuffs.intent_graph")
+    if not graph:
+        _LOGGER.error("intent.fsticuffs.intent_graph is required")
+        return []
 
-        add_standard_args(
-            profile,
-            intent_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    examples = profile.get("intent.fuzzywuzzy.examples_json")
+    if not examples:
+        _LOGGER.error("intent.fuzzywuzzy.examples_json is required")
+        return []
 
-        # Add --lang
-        add_lang_args(profile, intent_command, "intent")
+    intent_command = [
+        "rhasspy-fuzzywuzzy-hermes",
+        "--intent-graph",
+        quote_path(profile, graph),
+        "--examples",
+        quote_path(profile, examples),
+    ]
 
-        confidence_threshold = profile.get("intent.fuzzywuzzy.min_confidence")
-        if confidence_threshold is not None:
-            intent_command.extend(["--confidence-threshold", str(confidence_threshold)])
+    add_standard_args(
+        profile,
+        intent_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        replace_numbers = profile.get("intent.replace_numbers", True)
-        if replace_numbers:
-            intent_command.append("--replace-numbers")
+    # Add --lang
+    add_lang_args(profile, intent_command, "intent")
 
-            locale = profile.get("locale")
-            if locale:
-                intent_command.extend(["--language", str(locale)])
+    confidence_threshold = profile.get("intent.fuzzywuzzy.min_confidence")
+    if confidence_threshold is not None:
+        intent_command.extend(("--confidence-threshold", str(confidence_threshold)))
 
-        # Case transformation
-        if dictionary_casing:
-            intent_command.extend(["--casing", dictionary_casing])
+    replace_numbers = profile.get("intent.replace_numbers", True)
+    if replace_numbers:
+        intent_command.append("--replace-numbers")
 
-        # Directory with custom converter scripts
-        converters_dir = profile.get("intent.fuzzywuzzy.converters_dir", "converters")
-        intent_command.extend(
-            ["--converters-dir", shlex.quote(str(write_path(profile, converters_dir)))]
-        )
+        locale = profile.get("locale")
+        if locale:
+            intent_command.extend(("--language", str(locale)))
 
-        return intent_command
+    # Case transformation
+    if dictionary_casing:
+        intent_command.extend(("--casing", dictionary_casing))
 
-    if intent_system == "rasa":
-        url = profile.get("intent.rasa.url", "")
-        if not url:
-            _LOGGER.error("intent.rasa.url is required")
-            return []
+    # Directory with custom converter scripts
+    converters_dir = profile.get("intent.fuzzywuzzy.converters_dir", "converters")
+    intent_command.extend(("--converters-dir", quote_path(profile, converters_dir)))
 
-        intent_command = [
-            "rhasspy-rasa-nlu-hermes",
-            "--rasa-url",
-            shlex.quote(str(url)),
-        ]
+    return intent_command
 
-        add_standard_args(
-            profile,
-            intent_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
 
-        # Add --lang
-        add_lang_args(profile, intent_command, "intent")
+def _get_intent_recognition_rasa(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Rasa NLU intent recognition system"""
+    dictionary_casing = profile.get("speech_to_text.dictionary_casing")
 
-        language = profile.get("intent.rasa.language")
-        if language:
-            intent_command.extend(["--rasa-language", shlex.quote(str(language))])
+    url = profile.get("intent.rasa.url", "")
+    if not url:
+        _LOGGER.error("intent.rasa.url is required")
+        return []
 
-        config_yaml = profile.get("intent.rasa.config_yaml")
-        if config_yaml:
-            intent_command.extend(
-                ["--rasa-config", shlex.quote(str(write_path(profile, config_yaml)))]
-            )
+    intent_command = [
+        "rhasspy-rasa-nlu-hermes",
+        "--rasa-url",
+        shlex.quote(str(url)),
+    ]
 
-        project_name = profile.get("intent.rasa.project_name")
-        if project_name:
-            intent_command.extend(["--rasa-project", shlex.quote(str(project_name))])
+    add_standard_args(
+        profile,
+        intent_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        examples = profile.get("intent.rasa.examples_markdown")
-        if examples:
-            intent_command.extend(
-                ["--examples-path", shlex.quote(str(write_path(profile, examples)))]
-            )
+    # Add --lang
+    add_lang_args(profile, intent_command, "intent")
 
-        replace_numbers = profile.get("intent.replace_numbers", True)
-        if replace_numbers:
-            intent_command.append("--replace-numbers")
+    language = profile.get("intent.rasa.language")
+    if language:
+        intent_command.extend(("--rasa-language", shlex.quote(str(language))))
 
-            locale = profile.get("locale")
-            if locale:
-                intent_command.extend(["--number-language", str(locale)])
+    config_yaml = profile.get("intent.rasa.config_yaml")
+    if config_yaml:
+        intent_command.extend(("--rasa-config", quote_path(profile, config_yaml)))
 
-        # Case transformation
-        if dictionary_casing:
-            intent_command.extend(["--casing", dictionary_casing])
+    project_name = profile.get("intent.rasa.project_name")
+    if project_name:
+        intent_command.extend(("--rasa-project", shlex.quote(str(project_name))))
 
-        return intent_command
+    examples = profile.get("intent.rasa.examples_markdown")
+    if examples:
+        intent_command.extend(("--examples-path", quote_path(profile, examples)))
 
-    if intent_system == "command":
-        user_program = profile.get("intent.command.program")
-        if not user_program:
-            _LOGGER.error("intent.command.program is required")
-            return []
+    replace_numbers = profile.get("intent.replace_numbers", True)
+    if replace_numbers:
+        intent_command.append("--replace-numbers")
 
-        user_command = [user_program] + command_args(
-            profile.get("intent.command.arguments", [])
-        )
+        locale = profile.get("locale")
+        if locale:
+            intent_command.extend(("--number-language", str(locale)))
 
-        intent_command = [
-            "rhasspy-remote-http-hermes",
-            "--nlu-command",
-            shlex.quote(" ".join(str(v) for v in user_command)),
-        ]
+    # Case transformation
+    if dictionary_casing:
+        intent_command.extend(("--casing", dictionary_casing))
 
-        add_standard_args(
-            profile,
-            intent_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    return intent_command
 
-        # Add --lang
-        add_lang_args(profile, intent_command, "intent")
 
-        # Case transformation
-        if dictionary_casing:
-            intent_command.extend(["--casing", dictionary_casing])
+def _get_intent_recognition_command(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for external program intent recognition system"""
+    dictionary_casing = profile.get("speech_to_text.dictionary_casing")
 
-        add_ssl_args(intent_command, profile)
+    user_program = profile.get("intent.command.program")
+    if not user_program:
+        _LOGGER.error("intent.command.program is required")
+        return []
 
-        # Training
-        intent_train_system = profile.get("training.intent.system", "auto")
-        if intent_train_system == "auto":
-            train_program = profile.get("training.intent.command.program")
-            if train_program:
-                train_command = [train_program] + command_args(
-                    profile.get("training.intent.command.arguments", [])
-                )
-                intent_command.extend(
-                    [
-                        "--nlu-train-command",
-                        shlex.quote(" ".join(str(v) for v in train_command)),
-                    ]
-                )
-            else:
-                _LOGGER.warning("No intent training command was provided")
+    user_command = [user_program] + command_args(
+        profile.get("intent.command.arguments", [])
+    )
 
-        return intent_command
+    intent_command = [
+        "rhasspy-remote-http-hermes",
+        "--nlu-command",
+        quote_command(user_command),
+    ]
+
+    add_standard_args(
+        profile,
+        intent_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-    if intent_system == "snips":
-        language = profile.get("intent.snips.language") or profile.get("language", "en")
-        if not language:
-            _LOGGER.error("intent.snips.language is required")
-            return []
+    # Add --lang
+    add_lang_args(profile, intent_command, "intent")
 
-        intent_command = [
-            "rhasspy-snips-nlu-hermes",
-            "--language",
-            shlex.quote(str(language)),
-        ]
+    # Case transformation
+    if dictionary_casing:
+        intent_command.extend(("--casing", dictionary_casing))
 
-        add_standard_args(
-            profile,
-            intent_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_ssl_args(intent_command, profile)
 
-        engine_path = profile.get("intent.snips.engine_dir")
-        if engine_path:
-            intent_command.extend(
-                ["--engine-path", shlex.quote(str(write_path(profile, engine_path)))]
+    # Training
+    intent_train_system = profile.get("training.intent.system", "auto")
+    if intent_train_system == "auto":
+        train_program = profile.get("training.intent.command.program")
+        if train_program:
+            train_command = [train_program] + command_args(
+                profile.get("training.intent.command.arguments", [])
             )
+            intent_command.extend(("--nlu-train-command", quote_command(train_command)))
+        else:
+            _LOGGER.warning("No intent training command was provided")
 
-        dataset_path = profile.get("intent.snips.dataset_file")
-        if dataset_path:
-            intent_command.extend(
-                ["--dataset-path", shlex.quote(str(write_path(profile, dataset_path)))]
-            )
+    return intent_command
+
+
+def _get_intent_recognition_snips(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Snips NLU intent recognition system"""
+    dictionary_casing = profile.get("speech_to_text.dictionary_casing")
 
-        # Case transformation
-        if dictionary_casing:
-            intent_command.extend(["--casing", dictionary_casing])
+    language = profile.get("intent.snips.language") or profile.get("language", "en")
+    if not language:
+        _LOGGER.error("intent.snips.language is required")
+        return []
 
-        return intent_command
+    intent_command = [
+        "rhasspy-snips-nlu-hermes",
+        "--language",
+        shlex.quote(str(language)),
+    ]
 
-    if intent_system == "remote":
-        url = profile.get("intent.remote.url")
-        if not url:
-            _LOGGER.error("intent.remote.url is required")
-            return []
+    add_standard_args(
+        profile,
+        intent_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        intent_command = ["rhasspy-remote-http-hermes", "--nlu-url", shlex.quote(url)]
+    engine_path = profile.get("intent.snips.engine_dir")
+    if engine_path:
+        intent_command.extend(("--engine-path", quote_path(profile, engine_path)))
 
-        add_standard_args(
-            profile,
-            intent_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    dataset_path = profile.get("intent.snips.dataset_file")
+    if dataset_path:
+        intent_command.extend(("--dataset-path", quote_path(profile, dataset_path)))
+
+    # Case transformation
+    if dictionary_casing:
+        intent_command.extend(("--casing", dictionary_casing))
+
+    return intent_command
+
+
+def _get_intent_recognition_remote(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for remote HTTP intent recognition system"""
+    dictionary_casing = profile.get("speech_to_text.dictionary_casing")
+
+    url = profile.get("intent.remote.url")
+    if not url:
+        _LOGGER.error("intent.remote.url is required")
+        return []
+
+    intent_command = ["rhasspy-remote-http-hermes", "--nlu-url", shlex.quote(url)]
 
-        # Add --lang
-        add_lang_args(profile, intent_command, "intent")
+    add_standard_args(
+        profile,
+        intent_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Case transformation
-        if dictionary_casing:
-            intent_command.extend(["--casing", dictionary_casing])
+    # Add --lang
+    add_lang_args(profile, intent_command, "intent")
 
-        add_ssl_args(intent_command, profile)
+    # Case transformation
+    if dictionary_casing:
+        intent_command.extend(("--casing", dictionary_casing))
 
-        # Training
-        intent_train_system = profile.get("training.intent.system", "auto")
-        if intent_train_system == "auto":
-            train_url = profile.get("training.intent.remote.url")
-            if train_url:
-                intent_command.extend(["--nlu-train-url", shlex.quote(train_url)])
-            else:
-                _LOGGER.warning("No intent training URL was provided")
+    add_ssl_args(intent_command, profile)
 
-        return intent_command
+    # Training
+    intent_train_system = profile.get("training.intent.system", "auto")
+    if intent_train_system == "auto":
+        train_url = profile.get("training.intent.remote.url")
+        if train_url:
+            intent_command.extend(("--nlu-train-url", shlex.quote(train_url)))
+        else:
+            _LOGGER.warning("No intent training URL was provided")
+
+    return intent_command
+
+
+# Intent recognition command for each intent recognition system
+_INTENT_RECOGNITION_SYSTEMS: _CommandTable = {
+    "fsticuffs": _get_intent_recognition_fsticuffs,
+    "fuzzywuzzy": _get_intent_recognition_fuzzywuzzy,
+    "rasa": _get_intent_recognition_rasa,
+    "command": _get_intent_recognition_command,
+    "snips": _get_intent_recognition_snips,
+    "remote": _get_intent_recognition_remote,
+}
+
+
+def get_intent_recognition(
+    intent_system: str,
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for intent recognition system"""
+    get_system_command = _INTENT_RECOGNITION_SYSTEMS.get(intent_system)
+    if get_system_command is None:
+        raise ValueError(f"Unsupported intent recogniton system (got {intent_system})")
 
-    raise ValueError(f"Unsupported intent recogniton system (got {intent_system})")
+    return get_system_command(
+        profile, site_ids, mqtt_host, mqtt_port, mqtt_username, mqtt_password
+    )
 
 
 def print_intent_recognition(
     intent_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -1929,128 +1982,170 @@ def print_intent_recognition(
     )
 
     if intent_command:
-        print("[program:intent_recognition]", file=out_file)
-        print("command=", " ".join(intent_command), sep="", file=out_file)
+        out_file.write(
+            f"[program:intent_recognition]\ncommand={' '.join(intent_command)}\n"
+        )
         write_boilerplate(out_file)
 
 
 # -----------------------------------------------------------------------------
 
 
-def get_intent_handling(
-    handle_system: str,
-    profile: Profile,
+def _get_intent_handling_hass(
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
     mqtt_port: int = 1883,
     mqtt_username: str = "",
     mqtt_password: str = "",
-):
-    """Get command for intent handling system"""
-    if handle_system == "hass":
-        url = profile.get("home_assistant.url")
-        if not url:
-            _LOGGER.error("home_assistant.url is required")
-            return []
+) -> typing.List[str]:
+    """Get command for Home Assistant intent handling system"""
+    url = profile.get("home_assistant.url")
+    if not url:
+        _LOGGER.error("home_assistant.url is required")
+        return []
 
-        handle_command = ["rhasspy-homeassistant-hermes", "--url", shlex.quote(url)]
+    handle_command = ["rhasspy-homeassistant-hermes", "--url", shlex.quote(url)]
 
-        add_standard_args(
-            profile,
-            handle_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        handle_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        handle_type = profile.get("home_assistant.handle_type")
-        if handle_type:
-            handle_command.extend(["--handle-type", str(handle_type)])
+    handle_type = profile.get("home_assistant.handle_type")
+    if handle_type:
+        handle_command.extend(("--handle-type", str(handle_type)))
 
-        # Additional options
-        access_token = profile.get("home_assistant.access_token")
-        if access_token:
-            handle_command.extend(["--access-token", str(access_token)])
+    # Additional options
+    access_token = profile.get("home_assistant.access_token")
+    if access_token:
+        handle_command.extend(("--access-token", str(access_token)))
 
-        api_password = profile.get("home_assistant.api_password")
-        if api_password:
-            handle_command.extend(["--api-password", str(api_password)])
+    api_password = profile.get("home_assistant.api_password")
+    if api_password:
+        handle_command.extend(("--api-password", str(api_password)))
 
-        event_type_format = profile.get("home_assistant.event_type_format")
-        if event_type_format:
-            handle_command.extend(["--event-type-format", str(event_type_format)])
+    event_type_format = profile.get("home_assistant.event_type_format")
+    if event_type_format:
+        handle_command.extend(("--event-type-format", str(event_type_format)))
 
-        pem_file = profile.get("home_assistant.pem_file")
-        if pem_file:
-            handle_command.extend(["--pem-file", str(pem_file)])
+    pem_file = profile.get("home_assistant.pem_file")
+    if pem_file:
+        handle_command.extend(("--pem-file", str(pem_file)))
 
-        return handle_command
+    return handle_command
 
-    if handle_system == "remote":
-        url = profile.get("handle.remote.url")
-        if not url:
-            _LOGGER.error("handle.remote.url is required")
-            return []
 
-        handle_command = [
-            "rhasspy-remote-http-hermes",
-            "--handle-url",
-            shlex.quote(url),
-        ]
+def _get_intent_handling_remote(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for remote HTTP intent handling system"""
+    url = profile.get("handle.remote.url")
+    if not url:
+        _LOGGER.error("handle.remote.url is required")
+        return []
+
+    handle_command = [
+        "rhasspy-remote-http-hermes",
+        "--handle-url",
+        shlex.quote(url),
+    ]
 
-        add_standard_args(
-            profile,
-            handle_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        handle_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        add_ssl_args(handle_command, profile)
+    add_ssl_args(handle_command, profile)
 
-        return handle_command
+    return handle_command
 
-    if handle_system == "command":
-        user_program = profile.get("handle.command.program")
-        if not user_program:
-            _LOGGER.error("handle.command.program is required")
-            return []
 
-        user_program = os.path.expandvars(user_program)
-        user_command = [user_program] + command_args(
-            profile.get("handle.command.arguments", [])
-        )
+def _get_intent_handling_command(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for external program intent handling system"""
+    user_program = profile.get("handle.command.program")
+    if not user_program:
+        _LOGGER.error("handle.command.program is required")
+        return []
+
+    user_program = os.path.expandvars(user_program)
+    user_command = [user_program] + command_args(
+        profile.get("handle.command.arguments", [])
+    )
 
-        handle_command = [
-            "rhasspy-remote-http-hermes",
-            "--handle-command",
-            shlex.quote(" ".join(str(v) for v in user_command)),
-        ]
+    handle_command = [
+        "rhasspy-remote-http-hermes",
+        "--handle-command",
+        quote_command(user_command),
+    ]
 
-        add_standard_args(
-            profile,
-            handle_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        handle_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        add_ssl_args(handle_command, profile)
+    add_ssl_args(handle_command, profile)
 
-        return handle_command
+    return handle_command
+
+
+# Intent handling command for each intent handling system
+_INTENT_HANDLING_SYSTEMS: _CommandTable = {
+    "hass": _get_intent_handling_hass,
+    "remote": _get_intent_handling_remote,
+    "command": _get_intent_handling_command,
+}
+
+
+def get_intent_handling(
+    handle_system: str,
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+):
+    """Get command for intent handling system"""
+    get_system_command = _INTENT_HANDLING_SYSTEMS.get(handle_system)
+    if get_system_command is None:
+        raise ValueError(f"Unsupported intent handling system (got {handle_system})")
 
-    raise ValueError(f"Unsupported intent handling system (got {handle_system})")
+    return get_system_command(
+        profile, site_ids, mqtt_host, mqtt_port, mqtt_username, mqtt_password
+    )
 
 
 def print_intent_handling(
     handle_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -2070,8 +2165,9 @@ def print_intent_handling(
     )
 
     if handle_command:
-        print("[program:intent_handling]", file=out_file)
-        print("command=", " ".join(handle_command), sep="", file=out_file)
+        out_file.write(
+            f"[program:intent_handling]\ncommand={' '.join(handle_command)}\n"
+        )
         write_boilerplate(out_file)
 
 
@@ -2080,7 +2176,7 @@ def print_intent_handling(
 
 def get_dialogue(
     dialogue_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     master_site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -2105,7 +2201,7 @@ def get_dialogue(
         # Seconds before a session times out
         session_timeout = str(profile.get("dialogue.session_timeout", ""))
         if session_timeout:
-            dialogue_command.extend(["--session-timeout", session_timeout])
+            dialogue_command.extend(("--session-timeout", session_timeout))
 
         # Add sounds (skip if no audio output system and no satellites)
         satellite_site_ids = profile.get("dialogue.satellite_site_ids")
@@ -2116,24 +2212,24 @@ def get_dialogue(
                 if sound_path:
                     sound_path = os.path.expandvars(sound_path)
                     dialogue_command.extend(
-                        ["--sound", sound_name, shlex.quote(str(sound_path))]
+                        ("--sound", sound_name, shlex.quote(str(sound_path)))
                     )
 
         if sound_system == "dummy":
             # Disable dialogue sounds on the base station for extra speed
             for site_id in master_site_ids:
-                dialogue_command.extend(["--no-sound", site_id])
+                dialogue_command.extend(("--no-sound", site_id))
 
         volume = str(profile.get("dialogue.volume", ""))
         if volume:
             # Volume scalar from 0-1
-            dialogue_command.extend(["--volume", volume])
+            dialogue_command.extend(("--volume", volume))
 
         group_separator = str(profile.get("dialogue.group_separator", ""))
         if group_separator:
             # String separating groups from names in site ids.
             # Used to avoid multiple wake ups from satellites that are co-located.
-            dialogue_command.extend(["--group-separator", group_separator])
+            dialogue_command.extend(("--group-separator", group_separator))
 
         # ASR confidence
         speech_system = profile.get("speech_to_text.system", "dummy")
@@ -2143,21 +2239,21 @@ def get_dialogue(
             )
             if min_asr_confidence is not None:
                 dialogue_command.extend(
-                    ["--min-asr-confidence", str(min_asr_confidence)]
+                    ("--min-asr-confidence", str(min_asr_confidence))
                 )
 
         # TTS timeout
         say_chars_per_second = profile.get("dialogue.say_chars_per_second")
         if say_chars_per_second is not None:
             dialogue_command.extend(
-                ["--say-chars-per-second", str(say_chars_per_second)]
+                ("--say-chars-per-second", str(say_chars_per_second))
             )
 
         # Feedback sound extensions (suffixes, e.g. '.wav')
         sound_suffixes = profile.get("dialogue.sound_suffixes")
         if sound_suffixes is not None:
             for sound_suffix in sound_suffixes:
-                dialogue_command.extend(["--sound-suffix", str(sound_suffix)])
+                dialogue_command.extend(("--sound-suffix", str(sound_suffix)))
 
         return dialogue_command
 
@@ -2166,7 +2262,7 @@ def get_dialogue(
 
 def print_dialogue(
     dialogue_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     master_site_ids: typing.List[str],
@@ -2188,8 +2284,7 @@ def print_dialogue(
     )
 
     if dialogue_command:
-        print("[program:dialogue]", file=out_file)
-        print("command=", " ".join(dialogue_command), sep="", file=out_file)
+        out_file.write(f"[program:dialogue]\ncommand={' '.join(dialogue_command)}\n")
         write_boilerplate(out_file)
 
 
@@ -2198,576 +2293,676 @@ def print_dialogue(
 # TODO: Add support for Google, NanoTTS
 
 
-def get_text_to_speech(
-    tts_system: str,
-    profile: Profile,
+def _get_text_to_speech_espeak(
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
     mqtt_port: int = 1883,
     mqtt_username: str = "",
     mqtt_password: str = "",
-):
-    """Get command for text to speech system"""
-    if tts_system == "espeak":
-        espeak_command = ["espeak", "--stdout", "-v", "{lang}"]
-
-        espeak_command.extend(profile.get("text_to_speech.espeak.arguments", []))
-
-        voice = str(profile.get("text_to_speech.espeak.voice", "")).strip()
-        if not voice:
-            voice = profile.get("language").strip()
-
-        if not voice:
-            voice = "en-us"
-
-        tts_command = [
-            "rhasspy-tts-cli-hermes",
-            "--tts-command",
-            shlex.quote(" ".join(str(v) for v in espeak_command)),
-            "--voices-command",
-            shlex.quote("espeak --voices | tail -n +2 | awk '{ print $2,$4 }'"),
-            "--language",
-            shlex.quote(str(voice)),
-        ]
-
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.espeak.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
+) -> typing.List[str]:
+    """Get command for eSpeak text to speech system"""
+    espeak_command = ["espeak", "--stdout", "-v", "{lang}"]
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    espeak_command.extend(profile.get("text_to_speech.espeak.arguments", []))
 
-        return tts_command
+    voice = str(profile.get("text_to_speech.espeak.voice", "")).strip()
+    if not voice:
+        voice = profile.get("language").strip()
 
-    if tts_system == "flite":
-        flite_command = ["flite", "-o", "/dev/stdout", "-voice", "{lang}"]
-        flite_command.extend(profile.get("text_to_speech.flite.arguments", []))
+    if not voice:
+        voice = "en-us"
 
-        # Text will be final argument
-        flite_command.append("-t")
+    tts_command = [
+        "rhasspy-tts-cli-hermes",
+        "--tts-command",
+        quote_command(espeak_command),
+        "--voices-command",
+        shlex.quote("espeak --voices | tail -n +2 | awk '{ print $2,$4 }'"),
+        "--language",
+        shlex.quote(str(voice)),
+    ]
 
-        voice = str(profile.get("text_to_speech.flite.voice", "slt")).strip()
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.espeak.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
 
-        tts_command = [
-            "rhasspy-tts-cli-hermes",
-            "--tts-command",
-            shlex.quote(" ".join(str(v) for v in flite_command)),
-            "--voices-command",
-            shlex.quote("flite -lv | cut -d: -f 2- | tr ' ' '\\n'"),
-            "--language",
-            shlex.quote(voice),
-        ]
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.flite.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
+    return tts_command
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
 
-        return tts_command
+def _get_text_to_speech_flite(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Flite text to speech system"""
+    flite_command = ["flite", "-o", "/dev/stdout", "-voice", "{lang}"]
+    flite_command.extend(profile.get("text_to_speech.flite.arguments", []))
+
+    # Text will be final argument
+    flite_command.append("-t")
+
+    voice = str(profile.get("text_to_speech.flite.voice", "slt")).strip()
+
+    tts_command = [
+        "rhasspy-tts-cli-hermes",
+        "--tts-command",
+        quote_command(flite_command),
+        "--voices-command",
+        shlex.quote("flite -lv | cut -d: -f 2- | tr ' ' '\\n'"),
+        "--language",
+        shlex.quote(voice),
+    ]
+
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.flite.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
 
-    if tts_system == "picotts":
-        extra_tts_args = []
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        if shutil.which("pico2wave"):
-            picotts_command = ["pico2wave", "-l", "{lang}", "-w", "{file}"]
-        else:
-            # Use nanotts instead
-            picotts_command = ["nanotts", "-v", "{lang}", "-o", "{file}"]
-            extra_tts_args.append("--text-on-stdin")
-
-        tts_command = [
-            "rhasspy-tts-cli-hermes",
-            "--tts-command",
-            shlex.quote(" ".join(str(v) for v in picotts_command)),
-            "--temporary-wav",
-        ] + extra_tts_args
-
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.picotts.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
+    return tts_command
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
 
-        picotts_language = str(profile.get("text_to_speech.picotts.language", ""))
-        if picotts_language:
-            tts_command.extend(["--language", shlex.quote(str(picotts_language))])
-        else:
-            # Fall back to profile locale
-            locale = str(profile.get("locale", "")).strip()
-
-            if locale:
-                locale = locale.replace("_", "-")
-                tts_command.extend(["--language", shlex.quote(str(locale))])
-
-        return tts_command
-
-    if tts_system == "nanotts":
-        nanotts_command = ["nanotts", "-v", "{lang}", "-o", "{file}"]
-        tts_command = [
-            "rhasspy-tts-cli-hermes",
-            "--tts-command",
-            shlex.quote(" ".join(str(v) for v in nanotts_command)),
-            "--temporary-wav",
-            "--text-on-stdin",
-        ]
-
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.nanotts.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
+def _get_text_to_speech_picotts(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for PicoTTS text to speech system"""
+    extra_tts_args = []
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    if shutil.which("pico2wave"):
+        picotts_command = _PICO2WAVE_TTS_COMMAND
+    else:
+        # Use nanotts instead
+        picotts_command = _NANOTTS_TTS_COMMAND
+        extra_tts_args.append("--text-on-stdin")
+
+    tts_command = [
+        "rhasspy-tts-cli-hermes",
+        "--tts-command",
+        shlex.quote(picotts_command),
+        "--temporary-wav",
+    ] + extra_tts_args
+
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.picotts.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
 
-        nanotts_language = str(profile.get("text_to_speech.nanotts.language", ""))
-        if nanotts_language:
-            tts_command.extend(["--language", shlex.quote(str(nanotts_language))])
-        else:
-            # Fall back to profile locale
-            locale = str(profile.get("locale", "")).strip()
-
-            if locale:
-                locale = locale.replace("_", "-")
-                tts_command.extend(["--language", shlex.quote(str(locale))])
-
-        langdir = str(profile.get("text_to_speech.nanotts.langdir", ""))
-
-        if langdir:
-            tts_command.extend(["-l", shlex.quote(os.path.expandvars(str(locale)))])
-
-        return tts_command
-
-    if tts_system == "marytts":
-        url = profile.get("text_to_speech.marytts.url", "").strip()
-        if not url:
-            _LOGGER.error("text_to_speech.marytts.url is required")
-            return []
-
-        effects = profile.get("text_to_speech.marytts.effects", {})
-        effects = [
-            ("--data-urlencode", shlex.quote("%s=%s" % pair))
-            for pair in effects.items()
-        ]
-        effects = list(itertools.chain(*effects))  # flatten tuples into list
-
-        # Oh the things curl can do
-        marytts_command = [
-            '{%% if "/" in lang: %%}{%% set lang, voice = lang.split("/", maxsplit=1) %%}{%% endif %%}',
-            "curl",
-            "-sS",
-            "-X",
-            "GET",
-            "-G",
-            "--output",
-            "-",
-            "--data-urlencode",
-            "INPUT_TYPE=TEXT",
-            "--data-urlencode",
-            "OUTPUT_TYPE=AUDIO",
-            "--data-urlencode",
-            "AUDIO=WAVE",
-            "--data-urlencode",
-            "LOCALE={{ lang }}",
-            "{%% if voice: %%}--data-urlencode{%% endif %%}",
-            "{%% if voice: %%}VOICE={{ voice }}{%% endif %%}",
-            "--data-urlencode",
-            'INPUT_TEXT="$0"',
-        ]
-        marytts_command += effects
-        marytts_command.append(shlex.quote(url))
-
-        voice = profile.get("text_to_speech.marytts.voice", "").strip()
-        if voice:
-            marytts_command.extend(["--data-urlencode", shlex.quote(f"VOICE={voice}")])
-
-        # Combine into bash call so we can pass input text as $0
-        bash_command = [
-            "bash",
-            "-c",
-            shlex.quote(" ".join(str(v) for v in marytts_command)),
-        ]
-
-        # localhost:59125/process -> localhost:59125
-        server_base_url = url
-        if server_base_url.endswith("/"):
-            server_base_url = server_base_url[:-1]
-
-        if server_base_url.endswith("/process"):
-            server_base_url = server_base_url[:-8]
-
-        voices_command = [
-            "curl",
-            "-sS",
-            "-X",
-            "GET",
-            shlex.quote(server_base_url + "/voices"),
-        ]
-
-        locale = str(profile.get("text_to_speech.marytts.locale", "en-US")).strip()
-
-        tts_command = [
-            "rhasspy-tts-cli-hermes",
-            "--tts-command",
-            shlex.quote(" ".join(str(v) for v in bash_command)),
-            "--voices-command",
-            shlex.quote(" ".join(str(v) for v in voices_command)),
-            "--language",
-            shlex.quote(locale),
-            "--use-jinja2",
-        ]
-
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.marytts.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    picotts_language = str(profile.get("text_to_speech.picotts.language", ""))
+    if picotts_language:
+        tts_command.extend(("--language", shlex.quote(str(picotts_language))))
+    else:
+        # Fall back to profile locale
+        locale = str(profile.get("locale", "")).strip()
 
-        return tts_command
-
-    if tts_system == "wavenet":
-
-        voice = str(
-            profile.get("text_to_speech.wavenet.voice", "en-US-Wavenet-C")
-        ).strip()
-        sample_rate = str(profile.get("text_to_speech.wavenet.sample_rate", 22050))
-
-        credentials_json = profile.get("text_to_speech.wavenet.credentials_json")
-        if not credentials_json:
-            _LOGGER.error("text_to_speech.wavenet.credentials_json required")
-            return []
-
-        cache_dir = profile.get("text_to_speech.wavenet.cache_dir")
-        if not cache_dir:
-            _LOGGER.error("text_to_speech.wavenet.cache_dir is required")
-            return []
-
-        tts_command = [
-            "rhasspy-tts-wavenet-hermes",
-            "--credentials-json",
-            shlex.quote(str(write_path(profile, credentials_json))),
-            "--cache-dir",
-            shlex.quote(str(write_path(profile, cache_dir))),
-            "--voice",
-            shlex.quote(voice),
-            "--sample-rate",
-            shlex.quote(sample_rate),
-        ]
-
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.wavenet.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
+        if locale:
+            locale = locale.replace("_", "-")
+            tts_command.extend(("--language", shlex.quote(str(locale))))
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    return tts_command
 
-        return tts_command
 
-    if tts_system == "opentts":
-        url = profile.get("text_to_speech.opentts.url", "").strip()
-        if not url:
-            _LOGGER.error("text_to_speech.opentts.url is required")
-            return []
+def _get_text_to_speech_nanotts(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for NanoTTS text to speech system"""
+    tts_command = [
+        "rhasspy-tts-cli-hermes",
+        "--tts-command",
+        shlex.quote(_NANOTTS_TTS_COMMAND),
+        "--temporary-wav",
+        "--text-on-stdin",
+    ]
+
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.nanotts.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
 
-        voice = profile.get("text_to_speech.opentts.voice", "").strip()
-        voice_args = []
-        if voice:
-            voice_args = ["--data-urlencode", f"voice={voice}"]
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Oh the things curl can do
-        opentts_command = (
-            ["curl", "-sS", "-X", "GET", "-G", "--output", "-"]
-            + voice_args
-            + ["--data-urlencode", 'text="$0"', shlex.quote(urljoin(url, "api/tts"))]
-        )
+    nanotts_language = str(profile.get("text_to_speech.nanotts.language", ""))
+    if nanotts_language:
+        tts_command.extend(("--language", shlex.quote(str(nanotts_language))))
+    else:
+        # Fall back to profile locale
+        locale = str(profile.get("locale", "")).strip()
 
-        # Combine into bash call so we can pass input text as $0
-        bash_command = [
-            "bash",
-            "-c",
-            shlex.quote(" ".join(str(v) for v in opentts_command)),
-        ]
-
-        voices_command = [
-            "curl",
-            "-sS",
-            "-X",
-            "GET",
-            shlex.quote(urljoin(url, "api/voices")),
-            "|",
-            "jq",
-            "--raw-output",
-            shlex.quote('keys[] as $k | "\\($k) \\(.[$k] | .name)"'),
-        ]
-
-        tts_command = [
-            "rhasspy-tts-cli-hermes",
-            "--tts-command",
-            shlex.quote(" ".join(str(v) for v in bash_command)),
-            "--voices-command",
-            shlex.quote(" ".join(str(v) for v in voices_command)),
-        ]
-
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.opentts.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
+        if locale:
+            locale = locale.replace("_", "-")
+            tts_command.extend(("--language", shlex.quote(str(locale))))
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    langdir = str(profile.get("text_to_speech.nanotts.langdir", ""))
+
+    if langdir:
+        tts_command.extend(("-l", shlex.quote(os.path.expandvars(str(locale)))))
+
+    return tts_command
+
+
+def _get_text_to_speech_marytts(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for MaryTTS text to speech system"""
+    url = profile.get("text_to_speech.marytts.url", "").strip()
+    if not url:
+        _LOGGER.error("text_to_speech.marytts.url is required")
+        return []
+
+    effects = profile.get("text_to_speech.marytts.effects", {})
+    effects = [
+        ("--data-urlencode", shlex.quote("%s=%s" % pair)) for pair in effects.items()
+    ]
+    effects = list(itertools.chain(*effects))  # flatten tuples into list
+
+    # Oh the things curl can do
+    marytts_command = [
+        '{%% if "/" in lang: %%}{%% set lang, voice = lang.split("/", maxsplit=1) %%}{%% endif %%}',
+        "curl",
+        "-sS",
+        "-X",
+        "GET",
+        "-G",
+        "--output",
+        "-",
+        "--data-urlencode",
+        "INPUT_TYPE=TEXT",
+        "--data-urlencode",
+        "OUTPUT_TYPE=AUDIO",
+        "--data-urlencode",
+        "AUDIO=WAVE",
+        "--data-urlencode",
+        "LOCALE={{ lang }}",
+        "{%% if voice: %%}--data-urlencode{%% endif %%}",
+        "{%% if voice: %%}VOICE={{ voice }}{%% endif %%}",
+        "--data-urlencode",
+        'INPUT_TEXT="$0"',
+    ]
+    marytts_command += effects
+    marytts_command.append(shlex.quote(url))
+
+    voice = profile.get("text_to_speech.marytts.voice", "").strip()
+    if voice:
+        marytts_command.extend(("--data-urlencode", shlex.quote(f"VOICE={voice}")))
+
+    # Combine into bash call so we can pass input text as $0
+    bash_command = [
+        "bash",
+        "-c",
+        quote_command(marytts_command),
+    ]
+
+    # localhost:59125/process -> localhost:59125
+    server_base_url = url
+    if server_base_url.endswith("/"):
+        server_base_url = server_base_url[:-1]
+
+    if server_base_url.endswith("/process"):
+        server_base_url = server_base_url[:-8]
+
+    voices_command = [
+        "curl",
+        "-sS",
+        "-X",
+        "GET",
+        shlex.quote(server_base_url + "/voices"),
+    ]
+
+    locale = str(profile.get("text_to_speech.marytts.locale", "en-US")).strip()
+
+    tts_command = [
+        "rhasspy-tts-cli-hermes",
+        "--tts-command",
+        quote_command(bash_command),
+        "--voices-command",
+        quote_command(voices_command),
+        "--language",
+        shlex.quote(locale),
+        "--use-jinja2",
+    ]
+
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.marytts.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
+
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
+
+    return tts_command
+
+
+def _get_text_to_speech_wavenet(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Google Wavenet text to speech system"""
+
+    voice = str(profile.get("text_to_speech.wavenet.voice", "en-US-Wavenet-C")).strip()
+    sample_rate = str(profile.get("text_to_speech.wavenet.sample_rate", 22050))
+
+    credentials_json = profile.get("text_to_speech.wavenet.credentials_json")
+    if not credentials_json:
+        _LOGGER.error("text_to_speech.wavenet.credentials_json required")
+        return []
+
+    cache_dir = profile.get("text_to_speech.wavenet.cache_dir")
+    if not cache_dir:
+        _LOGGER.error("text_to_speech.wavenet.cache_dir is required")
+        return []
+
+    tts_command = [
+        "rhasspy-tts-wavenet-hermes",
+        "--credentials-json",
+        quote_path(profile, credentials_json),
+        "--cache-dir",
+        quote_path(profile, cache_dir),
+        "--voice",
+        shlex.quote(voice),
+        "--sample-rate",
+        shlex.quote(sample_rate),
+    ]
+
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.wavenet.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
 
-        return tts_command
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
+
+    return tts_command
+
+
+def _get_text_to_speech_opentts(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for OpenTTS text to speech system"""
+    url = profile.get("text_to_speech.opentts.url", "").strip()
+    if not url:
+        _LOGGER.error("text_to_speech.opentts.url is required")
+        return []
+
+    voice = profile.get("text_to_speech.opentts.voice", "").strip()
+    voice_args = []
+    if voice:
+        voice_args = ["--data-urlencode", f"voice={voice}"]
+
+    # Oh the things curl can do
+    opentts_command = (
+        ["curl", "-sS", "-X", "GET", "-G", "--output", "-"]
+        + voice_args
+        + ["--data-urlencode", 'text="$0"', shlex.quote(urljoin(url, "api/tts"))]
+    )
+
+    # Combine into bash call so we can pass input text as $0
+    bash_command = [
+        "bash",
+        "-c",
+        quote_command(opentts_command),
+    ]
+
+    voices_command = [
+        "curl",
+        "-sS",
+        "-X",
+        "GET",
+        shlex.quote(urljoin(url, "api/voices")),
+        "|",
+        "jq",
+        "--raw-output",
+        shlex.quote('keys[] as $k | "\\($k) \\(.[$k] | .name)"'),
+    ]
+
+    tts_command = [
+        "rhasspy-tts-cli-hermes",
+        "--tts-command",
+        quote_command(bash_command),
+        "--voices-command",
+        quote_command(voices_command),
+    ]
+
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.opentts.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
+
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
+
+    return tts_command
+
+
+def _get_text_to_speech_larynx(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for Larynx text to speech system"""
+    voices = typing.cast(
+        typing.Dict[str, typing.Dict[str, typing.Any]],
+        profile.get("text_to_speech.larynx.voices", {}),
+    )
 
-    if tts_system == "larynx":
-        voices = typing.cast(
-            typing.Dict[str, typing.Dict[str, typing.Any]],
-            profile.get("text_to_speech.larynx.voices", {}),
+    if not voices:
+        _LOGGER.error("text_to_speech.larynx.voices is required")
+        return []
+
+    default_voice = str(profile.get("text_to_speech.larynx.default_voice", ""))
+    if not default_voice:
+        default_voice = next(iter(voices.keys()))
+        _LOGGER.warning("No default voice set. Using %s", default_voice)
+
+    cache_dir = profile.get("text_to_speech.larynx.cache_dir")
+    if not cache_dir:
+        _LOGGER.error("text_to_speech.larynx.cache_dir is required")
+        return []
+
+    tts_command = [
+        "rhasspy-tts-larynx-hermes",
+        "--default-voice",
+        shlex.quote(str(default_voice)),
+        "--cache-dir",
+        quote_path(profile, cache_dir),
+        "--gruut-dir",
+        quote_path(profile, "gruut"),
+    ]
+
+    larynx_vocoder = str(profile.get("text_to_speech.larynx.vocoder", "vctk_medium"))
+    hifi_gan_path = "tts/larynx/hifi_gan"
+    default_vocoder_type, default_vocoder_path = {
+        "universal_large": ("hifi_gan", f"{hifi_gan_path}/universal_large"),
+        "vctk_medium": ("hifi_gan", f"{hifi_gan_path}/vctk_medium"),
+        "vctk_small": ("hifi_gan", f"{hifi_gan_path}/vctk_small"),
+    }[larynx_vocoder]
+
+    for voice, voice_settings in voices.items():
+        # Voice settings look like this:
+        # {
+        #   "language": "GRUUT LANGUAGE (en-us)",
+        #   "tts_type": "LARYNX MODEL TYPE (glow_tts)",
+        #   "tts_path": "${RHASSPY_PROFILE}/tts//larynx/<language>/<voice>/",
+        #   "vocoder_type": "LARYNX MODEL TYPE (hifi_gan)",
+        #   "vocoder_path": "${RHASSPY_PROFILE}/tts/larynx/<vocoder>/<model>/"
+        # }
+        voice_language = str(voice_settings["language"])
+        voice_tts_type = str(voice_settings["tts_type"])
+        voice_tts_path = str(voice_settings["tts_path"])
+        voice_vocoder_type = str(
+            voice_settings.get("vocoder_type", default_vocoder_type)
+        )
+        voice_vocoder_path = str(
+            voice_settings.get("vocoder_path", default_vocoder_path)
+        )
+
+        tts_command.extend(
+            (
+                "--voice",
+                shlex.quote(voice),
+                shlex.quote(voice_language),
+                shlex.quote(voice_tts_type),
+                quote_path(profile, voice_tts_path),
+                shlex.quote(voice_vocoder_type),
+                quote_path(profile, voice_vocoder_path),
+            )
         )
 
-        if not voices:
-            _LOGGER.error("text_to_speech.larynx.voices is required")
-            return []
-
-        default_voice = str(profile.get("text_to_speech.larynx.default_voice", ""))
-        if not default_voice:
-            default_voice = next(iter(voices.keys()))
-            _LOGGER.warning("No default voice set. Using %s", default_voice)
-
-        cache_dir = profile.get("text_to_speech.larynx.cache_dir")
-        if not cache_dir:
-            _LOGGER.error("text_to_speech.larynx.cache_dir is required")
-            return []
-
-        tts_command = [
-            "rhasspy-tts-larynx-hermes",
-            "--default-voice",
-            shlex.quote(str(default_voice)),
-            "--cache-dir",
-            shlex.quote(str(write_path(profile, cache_dir))),
-            "--gruut-dir",
-            shlex.quote(str(write_path(profile, "gruut"))),
-        ]
-
-        larynx_vocoder = str(
-            profile.get("text_to_speech.larynx.vocoder", "vctk_medium")
+        # Optional settings
+        tts_settings: typing.Dict[str, typing.Any] = voice_settings.get(
+            "tts_settings", {}
+        )
+        vocoder_settings: typing.Dict[str, typing.Any] = voice_settings.get(
+            "vocoder_settings", {}
         )
-        hifi_gan_path = "tts/larynx/hifi_gan"
-        default_vocoder_type, default_vocoder_path = {
-            "universal_large": ("hifi_gan", f"{hifi_gan_path}/universal_large"),
-            "vctk_medium": ("hifi_gan", f"{hifi_gan_path}/vctk_medium"),
-            "vctk_small": ("hifi_gan", f"{hifi_gan_path}/vctk_small"),
-        }[larynx_vocoder]
-
-        for voice, voice_settings in voices.items():
-            # Voice settings look like this:
-            # {
-            #   "language": "GRUUT LANGUAGE (en-us)",
-            #   "tts_type": "LARYNX MODEL TYPE (glow_tts)",
-            #   "tts_path": "${RHASSPY_PROFILE}/tts//larynx/<language>/<voice>/",
-            #   "vocoder_type": "LARYNX MODEL TYPE (hifi_gan)",
-            #   "vocoder_path": "${RHASSPY_PROFILE}/tts/larynx/<vocoder>/<model>/"
-            # }
-            voice_language = str(voice_settings["language"])
-            voice_tts_type = str(voice_settings["tts_type"])
-            voice_tts_path = str(voice_settings["tts_path"])
-            voice_vocoder_type = str(
-                voice_settings.get("vocoder_type", default_vocoder_type)
-            )
-            voice_vocoder_path = str(
-                voice_settings.get("vocoder_path", default_vocoder_path)
-            )
 
+        for tts_key, tts_value in tts_settings.items():
             tts_command.extend(
-                [
-                    "--voice",
+                (
+                    "--tts-setting",
                     shlex.quote(voice),
-                    shlex.quote(voice_language),
-                    shlex.quote(voice_tts_type),
-                    shlex.quote(str(write_path(profile, voice_tts_path))),
-                    shlex.quote(voice_vocoder_type),
-                    shlex.quote(str(write_path(profile, voice_vocoder_path))),
-                ]
+                    shlex.quote(str(tts_key)),
+                    shlex.quote(str(tts_value)),
+                )
             )
 
-            # Optional settings
-            tts_settings: typing.Dict[str, typing.Any] = voice_settings.get(
-                "tts_settings", {}
-            )
-            vocoder_settings: typing.Dict[str, typing.Any] = voice_settings.get(
-                "vocoder_settings", {}
+        for vocoder_key, vocoder_value in vocoder_settings.items():
+            tts_command.extend(
+                (
+                    "--vocoder-setting",
+                    shlex.quote(voice),
+                    shlex.quote(str(vocoder_key)),
+                    shlex.quote(str(vocoder_value)),
+                )
             )
 
-            for tts_key, tts_value in tts_settings.items():
-                tts_command.extend(
-                    [
-                        "--tts-setting",
-                        shlex.quote(voice),
-                        shlex.quote(str(tts_key)),
-                        shlex.quote(str(tts_value)),
-                    ]
-                )
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.larynx.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
 
-            for vocoder_key, vocoder_value in vocoder_settings.items():
-                tts_command.extend(
-                    [
-                        "--vocoder-setting",
-                        shlex.quote(voice),
-                        shlex.quote(str(vocoder_key)),
-                        shlex.quote(str(vocoder_value)),
-                    ]
-                )
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.larynx.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
+    return tts_command
+
+
+def _get_text_to_speech_command(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for external program text to speech system"""
+    say_program = profile.get("text_to_speech.command.say_program")
+    if not say_program:
+        _LOGGER.error("text_to_speech.command.say_program is required")
+        return []
+
+    say_command = [say_program] + command_args(
+        profile.get("text_to_speech.command.say_arguments", [])
+    )
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    tts_command = [
+        "rhasspy-tts-cli-hermes",
+        "--tts-command",
+        quote_command(say_command),
+    ]
 
-        return tts_command
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-    if tts_system == "command":
-        say_program = profile.get("text_to_speech.command.say_program")
-        if not say_program:
-            _LOGGER.error("text_to_speech.command.say_program is required")
-            return []
+    # Add volume scalar (0-1)
+    volume = str(profile.get("text_to_speech.command.volume", ""))
+    if volume:
+        tts_command.extend(("--volume", volume))
 
-        say_command = [say_program] + command_args(
-            profile.get("text_to_speech.command.say_arguments", [])
+    voices_program = profile.get("text_to_speech.command.voices_program")
+    if voices_program:
+        voices_command = [voices_program] + command_args(
+            profile.get("text_to_speech.command.voices_arguments", [])
         )
+        tts_command.extend(("--voices-command", quote_command(voices_command)))
 
-        tts_command = [
-            "rhasspy-tts-cli-hermes",
-            "--tts-command",
-            shlex.quote(" ".join(str(v) for v in say_command)),
-        ]
+    language = profile.get("text_to_speech.command.language")
+    if language:
+        tts_command.extend(("--language", shlex.quote(str(language))))
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    return tts_command
 
-        # Add volume scalar (0-1)
-        volume = str(profile.get("text_to_speech.command.volume", ""))
-        if volume:
-            tts_command.extend(["--volume", volume])
 
-        voices_program = profile.get("text_to_speech.command.voices_program")
-        if voices_program:
-            voices_command = [voices_program] + command_args(
-                profile.get("text_to_speech.command.voices_arguments", [])
-            )
-            tts_command.extend(
-                [
-                    "--voices-command",
-                    shlex.quote(" ".join(str(v) for v in voices_command)),
-                ]
-            )
+def _get_text_to_speech_remote(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for remote HTTP text to speech system"""
+    url = profile.get("text_to_speech.remote.url")
+    if not url:
+        _LOGGER.error("text_to_speech.remote.url is required")
+        return []
 
-        language = profile.get("text_to_speech.command.language")
-        if language:
-            tts_command.extend(["--language", shlex.quote(str(language))])
+    tts_command = ["rhasspy-remote-http-hermes", "--tts-url", shlex.quote(url)]
 
-        return tts_command
+    add_standard_args(
+        profile,
+        tts_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-    if tts_system == "remote":
-        url = profile.get("text_to_speech.remote.url")
-        if not url:
-            _LOGGER.error("text_to_speech.remote.url is required")
-            return []
+    add_ssl_args(tts_command, profile)
 
-        tts_command = ["rhasspy-remote-http-hermes", "--tts-url", shlex.quote(url)]
+    return tts_command
 
-        add_standard_args(
-            profile,
-            tts_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
 
-        add_ssl_args(tts_command, profile)
+# Text to speech command for each text to speech system
+_TEXT_TO_SPEECH_SYSTEMS: _CommandTable = {
+    "espeak": _get_text_to_speech_espeak,
+    "flite": _get_text_to_speech_flite,
+    "picotts": _get_text_to_speech_picotts,
+    "nanotts": _get_text_to_speech_nanotts,
+    "marytts": _get_text_to_speech_marytts,
+    "wavenet": _get_text_to_speech_wavenet,
+    "opentts": _get_text_to_speech_opentts,
+    "larynx": _get_text_to_speech_larynx,
+    "command": _get_text_to_speech_command,
+    "remote": _get_text_to_speech_remote,
+}
+
 
-        return tts_command
+def get_text_to_speech(
+    tts_system: str,
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+):
+    """Get command for text to speech system"""
+    get_system_command = _TEXT_TO_SPEECH_SYSTEMS.get(tts_system)
+    if get_system_command is None:
+        raise ValueError(f"Unsupported text to speech system (got {tts_system})")
 
-    raise ValueError(f"Unsupported text to speech system (got {tts_system})")
+    return get_system_command(
+        profile, site_ids, mqtt_host, mqtt_port, mqtt_username, mqtt_password
+    )
 
 
 def print_text_to_speech(
     tts_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -2787,139 +2982,174 @@ def print_text_to_speech(
     )
 
     if tts_command:
-        print("[program:text_to_speech]", file=out_file)
-        print("command=", " ".join(tts_command), sep="", file=out_file)
+        out_file.write(f"[program:text_to_speech]\ncommand={' '.join(tts_command)}\n")
         write_boilerplate(out_file)
 
 
 # -----------------------------------------------------------------------------
 
 
-def get_speakers(
-    sound_system: str,
-    profile: Profile,
+def _get_speakers_aplay(
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
     mqtt_port: int = 1883,
     mqtt_username: str = "",
     mqtt_password: str = "",
 ) -> typing.List[str]:
-    """Get command for audio output system"""
-    if sound_system == "aplay":
-        play_command = ["aplay", "-q", "-t", "wav"]
-        list_command = ["aplay", "-L"]
-        sound_device = profile.get("sounds.aplay.device", "").strip()
-        if sound_device:
-            play_command.extend(["-D", str(sound_device)])
-
-        output_command = [
-            "rhasspy-speakers-cli-hermes",
-            "--play-command",
-            shlex.quote(" ".join(play_command)),
-            "--list-command",
-            shlex.quote(" ".join(list_command)),
-        ]
-
-        volume = str(profile.get("sounds.aplay.volume", ""))
-        if volume:
-            output_command.extend(["--volume", volume])
+    """Get command for ALSA aplay audio output system"""
+    aplay_command = _APLAY_PLAY_COMMAND
+    sound_device = profile.get("sounds.aplay.device", "").strip()
+    if sound_device:
+        aplay_command += " -D " + str(sound_device)
+
+    output_command = [
+        "rhasspy-speakers-cli-hermes",
+        "--play-command",
+        shlex.quote(aplay_command),
+        "--list-command",
+        shlex.quote(_APLAY_LIST_COMMAND),
+    ]
+
+    volume = str(profile.get("sounds.aplay.volume", ""))
+    if volume:
+        output_command.extend(("--volume", volume))
 
-        add_standard_args(
-            profile,
-            output_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        output_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        return output_command
+    return output_command
 
-    if sound_system == "command":
-        # Command to play WAV files
-        play_program = profile.get("sounds.command.play_program")
-        if not play_program:
-            _LOGGER.error("sounds.command.play_program is required")
-            return []
 
-        play_command = [play_program] + command_args(
-            profile.get("sounds.command.play_arguments", [])
-        )
+def _get_speakers_command(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for external program audio output system"""
+    # Command to play WAV files
+    play_program = profile.get("sounds.command.play_program")
+    if not play_program:
+        _LOGGER.error("sounds.command.play_program is required")
+        return []
+
+    play_command = [play_program] + command_args(
+        profile.get("sounds.command.play_arguments", [])
+    )
 
-        output_command = [
-            "rhasspy-speakers-cli-hermes",
-            "--play-command",
-            shlex.quote(" ".join(str(v) for v in play_command)),
-        ]
+    output_command = [
+        "rhasspy-speakers-cli-hermes",
+        "--play-command",
+        quote_command(play_command),
+    ]
 
-        add_standard_args(
-            profile,
-            output_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    add_standard_args(
+        profile,
+        output_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
 
-        # Command to list available audio output devices
-        list_program = profile.get("sounds.command.list_program")
-        if list_program:
-            list_command = [list_program] + profile.get(
-                "sounds.command.list_arguments", []
-            )
-            output_command.extend(
-                ["--list-command", shlex.quote(" ".join(str(v) for v in list_command))]
-            )
-        else:
-            _LOGGER.warning("No sound output device listing command provided.")
-
-        return output_command
-
-    if sound_system == "remote":
-        # POST WAV data to URL
-        url = profile.get("sounds.remote.url")
-        if not url:
-            _LOGGER.error("sounds.remote.url is required")
-            return []
-
-        play_command = [
-            "curl",
-            "-s",
-            "-X",
-            "POST",
-            "-H",
-            "Content-Type: audio/wav",
-            "--data-binary",
-            "@-",
-            shlex.quote(str(url)),
-        ]
-
-        output_command = [
-            "rhasspy-speakers-cli-hermes",
-            "--play-command",
-            shlex.quote(" ".join(str(v) for v in play_command)),
-        ]
+    # Command to list available audio output devices
+    list_program = profile.get("sounds.command.list_program")
+    if list_program:
+        list_command = [list_program] + profile.get("sounds.command.list_arguments", [])
+        output_command.extend(("--list-command", quote_command(list_command)))
+    else:
+        _LOGGER.warning("No sound output device listing command provided.")
 
-        add_standard_args(
-            profile,
-            output_command,
-            site_ids,
-            mqtt_host,
-            mqtt_port,
-            mqtt_username,
-            mqtt_password,
-        )
+    return output_command
+
+
+def _get_speakers_remote(
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for remote HTTP audio output system"""
+    # POST WAV data to URL
+    url = profile.get("sounds.remote.url")
+    if not url:
+        _LOGGER.error("sounds.remote.url is required")
+        return []
+
+    play_command = [
+        "curl",
+        "-s",
+        "-X",
+        "POST",
+        "-H",
+        "Content-Type: audio/wav",
+        "--data-binary",
+        "@-",
+        shlex.quote(str(url)),
+    ]
+
+    output_command = [
+        "rhasspy-speakers-cli-hermes",
+        "--play-command",
+        quote_command(play_command),
+    ]
 
-        return output_command
+    add_standard_args(
+        profile,
+        output_command,
+        site_ids,
+        mqtt_host,
+        mqtt_port,
+        mqtt_username,
+        mqtt_password,
+    )
+
+    return output_command
+
+
+# Audio output command for each audio output system
+_SPEAKER_SYSTEMS: _CommandTable = {
+    "aplay": _get_speakers_aplay,
+    "command": _get_speakers_command,
+    "remote": _get_speakers_remote,
+}
+
+
+def get_speakers(
+    sound_system: str,
+    profile: _AnyProfile,
+    site_ids: typing.List[str],
+    mqtt_host: str = "localhost",
+    mqtt_port: int = 1883,
+    mqtt_username: str = "",
+    mqtt_password: str = "",
+) -> typing.List[str]:
+    """Get command for audio output system"""
+    get_system_command = _SPEAKER_SYSTEMS.get(sound_system)
+    if get_system_command is None:
+        raise ValueError(f"Unsupported sound output system (got {sound_system})")
 
-    raise ValueError(f"Unsupported sound output system (got {sound_system})")
+    return get_system_command(
+        profile, site_ids, mqtt_host, mqtt_port, mqtt_username, mqtt_password
+    )
 
 
 def print_speakers(
     sound_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -2939,8 +3169,7 @@ def print_speakers(
     )
 
     if output_command:
-        print("[program:speakers]", file=out_file)
-        print("command=", " ".join(output_command), sep="", file=out_file)
+        out_file.write(f"[program:speakers]\ncommand={' '.join(output_command)}\n")
         write_boilerplate(out_file)
 
 
@@ -2949,7 +3178,7 @@ def print_speakers(
 
 def get_webhooks(
     webhooks: typing.Dict[str, typing.Any],
-    profile: Profile,
+    profile: _AnyProfile,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
     mqtt_port: int = 1883,
@@ -2991,14 +3220,14 @@ def get_webhooks(
                 topics_urls.extend((topic, url) for url in urls)
 
     for topic, url in topics_urls:
-        webhook_command.extend(["--webhook", shlex.quote(topic), shlex.quote(url)])
+        webhook_command.extend(("--webhook", shlex.quote(topic), shlex.quote(url)))
 
     return webhook_command
 
 
 def print_webhooks(
     webhooks: typing.Dict[str, typing.Any],
-    profile: Profile,
+    profile: _AnyProfile,
     out_file: typing.TextIO,
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -3012,171 +3241,66 @@ def print_webhooks(
     )
 
     if webhook_command:
-        print("[program:webhooks]", file=out_file)
-        print("command=", " ".join(webhook_command), sep="", file=out_file)
+        out_file.write(f"[program:webhooks]\ncommand={' '.join(webhook_command)}\n")
         write_boilerplate(out_file)
 
 
+# -----------------------------------------------------------------------------
+
+# Programs in supervisord conf
+_SUPERVISORD_SYSTEMS: _SystemTable = (
+    ("microphone", "Microphone", print_microphone),
+    ("sounds", "Speakers", print_speakers),
+    ("wake", "Wake word", print_wake),
+    ("speech_to_text", "Speech to text", print_speech_to_text),
+    ("intent", "Intent recognition", print_intent_recognition),
+    ("handle", "Intent handling", print_intent_handling),
+    ("text_to_speech", "Text to speech", print_text_to_speech),
+    ("dialogue", "Dialogue", print_dialogue),
+)
+
 # -----------------------------------------------------------------------------
 # docker compose
 # -----------------------------------------------------------------------------
 
 
-def profile_to_docker(profile: Profile, out_file: typing.TextIO, local_mqtt_port=12183):
+def profile_to_docker(
+    profile: _AnyProfile, out_file: typing.TextIO, local_mqtt_port=12183
+):
     """Transform Rhasspy profile to docker-compose.yml"""
+    # Settings like mqtt.tls.* are read once per service
+    profile = _CachedProfile(profile)
     services: typing.Dict[str, typing.Any] = {}
 
     # MQTT
     master_site_ids = str(profile.get("mqtt.site_id", "default")).split(",")
 
-    mqtt_host = str(profile.get("mqtt.host", "localhost"))
-    mqtt_port = int(profile.get("mqtt.port", 1883))
-
-    mqtt_username = str(profile.get("mqtt.username", "")).strip()
-    mqtt_password = str(profile.get("mqtt.password", "")).strip()
-
-    remote_mqtt = str(profile.get("mqtt.enabled", False)).lower() == "true"
+    mqtt_settings, remote_mqtt = get_mqtt_settings(
+        profile, local_mqtt_port, local_mqtt_host="mqtt"
+    )
     if not remote_mqtt:
-        # Use internal broker (mosquitto) on custom port
-        mqtt_host = "mqtt"
-        mqtt_port = local_mqtt_port
-        mqtt_username = ""
-        mqtt_password = ""
         compose_mqtt(services, mqtt_port=local_mqtt_port)
 
     # -------------------------------------------------------------------------
 
-    # Microphone
-    mic_system = profile.get("microphone.system", "dummy")
-    if mic_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(
-            profile.get("microphone.satellite_site_ids", "")
-        ).split(",")
-        compose_microphone(
-            mic_system,
-            profile,
-            services,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Microphone disabled (system=%s)", mic_system)
-
-    # Speakers
-    sound_system = profile.get("sounds.system", "dummy")
-    if sound_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("sounds.satellite_site_ids", "")).split(
-            ","
-        )
-        compose_speakers(
-            sound_system,
-            profile,
-            services,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Speakers disabled (system=%s)", sound_system)
-
-    # Wake Word
-    wake_system = profile.get("wake.system", "dummy")
-    if wake_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("wake.satellite_site_ids", "")).split(",")
-        compose_wake(
-            wake_system,
-            profile,
-            services,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Wake word disabled (system=%s)", wake_system)
-
-    # Speech to Text
-    stt_system = profile.get("speech_to_text.system", "dummy")
-    if stt_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(
-            profile.get("speech_to_text.satellite_site_ids", "")
-        ).split(",")
-        compose_speech_to_text(
-            stt_system,
-            profile,
-            services,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Speech to text disabled (system=%s)", stt_system)
-
-    # Intent Recognition
-    intent_system = profile.get("intent.system", "dummy")
-    if intent_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("intent.satellite_site_ids", "")).split(
-            ","
-        )
-        compose_intent_recognition(
-            intent_system,
-            profile,
-            services,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Intent recognition disabled (system=%s)", intent_system)
+    for system_type, description, compose_system in _DOCKER_SYSTEMS:
+        system = profile.get(f"{system_type}.system", "dummy")
+        if system in _DISABLED_SYSTEMS:
+            _LOGGER.debug("%s disabled (system=%s)", description, system)
+            continue
 
-    # Text to Speech
-    tts_system = profile.get("text_to_speech.system", "dummy")
-    if tts_system not in {"dummy", "hermes"}:
         satellite_site_ids = str(
-            profile.get("text_to_speech.satellite_site_ids", "")
+            profile.get(f"{system_type}.satellite_site_ids", "")
         ).split(",")
-        compose_text_to_speech(
-            tts_system,
-            profile,
-            services,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Text to speech disabled (system=%s)", tts_system)
 
-    # Dialogue Management
-    dialogue_system = profile.get("dialogue.system", "dummy")
-    if dialogue_system not in {"dummy", "hermes"}:
-        satellite_site_ids = str(profile.get("dialogue.satellite_site_ids", "")).split(
-            ","
-        )
-        compose_dialogue(
-            dialogue_system,
-            profile,
-            services,
-            site_ids=(master_site_ids + satellite_site_ids),
-            master_site_ids=master_site_ids,
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
-        )
-    else:
-        _LOGGER.debug("Dialogue disabled (system=%s)", dialogue_system)
+        site_ids = master_site_ids + satellite_site_ids
+        if system_type == "dialogue":
+            # Dialogue manager needs to know which site ids are the base station
+            compose_system(
+                system, profile, services, site_ids, master_site_ids, *mqtt_settings
+            )
+        else:
+            compose_system(system, profile, services, site_ids, *mqtt_settings)
 
     # Webhooks
     webhooks = profile.get("webhooks", {})
@@ -3189,17 +3313,31 @@ def profile_to_docker(profile: Profile, out_file: typing.TextIO, local_mqtt_port
             webhooks,
             profile,
             services,
-            site_ids=(master_site_ids + satellite_site_ids),
-            mqtt_host=mqtt_host,
-            mqtt_port=mqtt_port,
-            mqtt_username=mqtt_username,
-            mqtt_password=mqtt_password,
+            master_site_ids + satellite_site_ids,
+            *mqtt_settings,
         )
 
     # Output
     yaml_dict = {"version": "2", "services": services}
 
-    yaml.safe_dump(yaml_dict, out_file)
+    # Delay import until use (only needed for docker compose)
+    import yaml
+
+    # Use libyaml emitter if PyYAML was built with it
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+    # Services are already in a sensible order, so skip key sorting and line wrapping.
+    # Emit to a string first so the file gets a single write.
+    yaml_str = yaml.dump(
+        yaml_dict,
+        Dumper=dumper,
+        default_flow_style=False,
+        sort_keys=False,
+        allow_unicode=True,
+        width=_YAML_MAX_WIDTH,
+    )
+
+    out_file.write(yaml_str)
 
 
 # -----------------------------------------------------------------------------
@@ -3221,7 +3359,7 @@ def compose_mqtt(services: typing.Dict[str, typing.Any], mqtt_port: int):
 
 def compose_microphone(
     mic_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     services: typing.Dict[str, typing.Any],
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -3241,14 +3379,7 @@ def compose_microphone(
     )
 
     if mic_command:
-        service_name = mic_command.pop(0)
-        services["microphone"] = {
-            "image": f"rhasspy/{service_name}",
-            "command": " ".join(mic_command),
-            "devices": ["/dev/snd"],
-            "depends_on": ["mqtt"],
-            "tty": True,
-        }
+        services["microphone"] = compose_service(mic_command, devices=["/dev/snd"])
 
 
 # -----------------------------------------------------------------------------
@@ -3256,7 +3387,7 @@ def compose_microphone(
 
 def compose_wake(
     wake_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     services: typing.Dict[str, typing.Any],
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -3276,14 +3407,9 @@ def compose_wake(
     )
 
     if wake_command:
-        service_name = wake_command.pop(0)
-        services["wake"] = {
-            "image": f"rhasspy/{service_name}",
-            "command": " ".join(wake_command),
-            "volumes": [f"{profile.user_profiles_dir}:{profile.user_profiles_dir}"],
-            "depends_on": ["mqtt"],
-            "tty": True,
-        }
+        services["wake"] = compose_service(
+            wake_command, volumes=[profiles_volume(profile)]
+        )
 
 
 # -----------------------------------------------------------------------------
@@ -3291,7 +3417,7 @@ def compose_wake(
 
 def compose_speech_to_text(
     stt_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     services: typing.Dict[str, typing.Any],
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -3311,14 +3437,9 @@ def compose_speech_to_text(
     )
 
     if stt_command:
-        service_name = stt_command.pop(0)
-        services["speech_to_text"] = {
-            "image": f"rhasspy/{service_name}",
-            "command": " ".join(stt_command),
-            "volumes": [f"{profile.user_profiles_dir}:{profile.user_profiles_dir}"],
-            "depends_on": ["mqtt"],
-            "tty": True,
-        }
+        services["speech_to_text"] = compose_service(
+            stt_command, volumes=[profiles_volume(profile)]
+        )
 
 
 # -----------------------------------------------------------------------------
@@ -3326,7 +3447,7 @@ def compose_speech_to_text(
 
 def compose_intent_recognition(
     intent_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     services: typing.Dict[str, typing.Any],
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -3346,14 +3467,9 @@ def compose_intent_recognition(
     )
 
     if intent_command:
-        service_name = intent_command.pop(0)
-        services["intent_recognition"] = {
-            "image": f"rhasspy/{service_name}",
-            "command": " ".join(intent_command),
-            "volumes": [f"{profile.user_profiles_dir}:{profile.user_profiles_dir}"],
-            "depends_on": ["mqtt"],
-            "tty": True,
-        }
+        services["intent_recognition"] = compose_service(
+            intent_command, volumes=[profiles_volume(profile)]
+        )
 
 
 # -----------------------------------------------------------------------------
@@ -3361,7 +3477,7 @@ def compose_intent_recognition(
 
 def compose_dialogue(
     dialogue_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     services: typing.Dict[str, typing.Any],
     site_ids: typing.List[str],
     master_site_ids: typing.List[str],
@@ -3383,13 +3499,7 @@ def compose_dialogue(
     )
 
     if dialogue_command:
-        service_name = dialogue_command.pop(0)
-        services["dialogue"] = {
-            "image": f"rhasspy/{service_name}",
-            "command": " ".join(dialogue_command),
-            "depends_on": ["mqtt"],
-            "tty": True,
-        }
+        services["dialogue"] = compose_service(dialogue_command)
 
 
 # -----------------------------------------------------------------------------
@@ -3397,7 +3507,7 @@ def compose_dialogue(
 
 def compose_text_to_speech(
     tts_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     services: typing.Dict[str, typing.Any],
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -3417,13 +3527,7 @@ def compose_text_to_speech(
     )
 
     if tts_command:
-        service_name = tts_command.pop(0)
-        services["text_to_speech"] = {
-            "image": f"rhasspy/{service_name}",
-            "command": " ".join(tts_command),
-            "depends_on": ["mqtt"],
-            "tty": True,
-        }
+        services["text_to_speech"] = compose_service(tts_command)
 
 
 # -----------------------------------------------------------------------------
@@ -3431,7 +3535,7 @@ def compose_text_to_speech(
 
 def compose_speakers(
     sound_system: str,
-    profile: Profile,
+    profile: _AnyProfile,
     services: typing.Dict[str, typing.Any],
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -3451,14 +3555,7 @@ def compose_speakers(
     )
 
     if output_command:
-        service_name = output_command.pop(0)
-        services["speakers"] = {
-            "image": f"rhasspy/{service_name}",
-            "command": " ".join(output_command),
-            "devices": ["/dev/snd"],
-            "depends_on": ["mqtt"],
-            "tty": True,
-        }
+        services["speakers"] = compose_service(output_command, devices=["/dev/snd"])
 
 
 # -----------------------------------------------------------------------------
@@ -3466,7 +3563,7 @@ def compose_speakers(
 
 def compose_webhooks(
     webhooks: typing.Dict[str, typing.Any],
-    profile: Profile,
+    profile: _AnyProfile,
     services: typing.Dict[str, typing.Any],
     site_ids: typing.List[str],
     mqtt_host: str = "localhost",
@@ -3480,84 +3577,137 @@ def compose_webhooks(
     )
 
     if webhook_command:
-        service_name = webhook_command.pop(0)
-        services["webhooks"] = {
-            "image": f"rhasspy/{service_name}",
-            "command": " ".join(webhook_command),
-            "depends_on": ["mqtt"],
-            "tty": True,
-        }
+        services["webhooks"] = compose_service(webhook_command)
+
+
+# -----------------------------------------------------------------------------
+
+
+def compose_service(
+    command: typing.List[str], **extra: typing.Any
+) -> typing.Dict[str, typing.Any]:
+    """Create docker compose service for a command (first item is program name)"""
+    service: typing.Dict[str, typing.Any] = {
+        "image": f"rhasspy/{command[0]}",
+        "command": " ".join(itertools.islice(command, 1, None)),
+    }
+    service.update(extra)
+
+    # Lists are not shared between services to avoid YAML anchors/aliases
+    service["depends_on"] = ["mqtt"]
+    service["tty"] = True
+
+    return service
+
+
+def profiles_volume(profile: _AnyProfile) -> str:
+    """Get docker volume that maps the user profiles directory into a service"""
+    user_profiles_dir = str(profile.user_profiles_dir)
+    return f"{user_profiles_dir}:{user_profiles_dir}"
 
 
 # -----------------------------------------------------------------------------
 
+# Services in docker compose
+_DOCKER_SYSTEMS: _SystemTable = (
+    ("microphone", "Microphone", compose_microphone),
+    ("sounds", "Speakers", compose_speakers),
+    ("wake", "Wake word", compose_wake),
+    ("speech_to_text", "Speech to text", compose_speech_to_text),
+    ("intent", "Intent recognition", compose_intent_recognition),
+    ("text_to_speech", "Text to speech", compose_text_to_speech),
+    ("dialogue", "Dialogue", compose_dialogue),
+)
 
-def add_ssl_args(command: typing.List[str], profile: Profile):
+# -----------------------------------------------------------------------------
+
+
+def add_ssl_args(command: typing.List[str], profile: _AnyProfile):
     """Add --certfile and --keyfile arguments."""
     certfile = profile.get("home_assistant.pem_file")
     keyfile = profile.get("home_assistant.key_file")
 
     if certfile:
-        command.extend(["--certfile", shlex.quote(os.path.expandvars(str(certfile)))])
+        command.extend(("--certfile", shlex.quote(os.path.expandvars(str(certfile)))))
 
     if keyfile:
-        command.extend(["--keyfile", shlex.quote(os.path.expandvars(str(keyfile)))])
+        command.extend(("--keyfile", shlex.quote(os.path.expandvars(str(keyfile)))))
 
 
-def add_silence_args(command: typing.List[str], profile: Profile):
+def add_silence_args(command: typing.List[str], profile: _AnyProfile):
     """Add silence detection arguments."""
-    skip_sec = str(profile.get("command.webrtcvad.skip_sec", ""))
-    if skip_sec:
-        command.extend(["--voice-skip-seconds", skip_sec])
+    for setting_name, silence_arg in _WEBRTCVAD_ARGS:
+        setting_value = str(profile.get(f"command.webrtcvad.{setting_name}", ""))
+        if setting_value:
+            command.extend((silence_arg, setting_value))
 
-    min_sec = str(profile.get("command.webrtcvad.min_sec", ""))
-    if min_sec:
-        command.extend(["--voice-min-seconds", min_sec])
 
-    max_sec = str(profile.get("command.webrtcvad.max_sec", ""))
-    if max_sec:
-        command.extend(["--voice-max-seconds", max_sec])
+_MISSING = object()
 
-    speech_sec = str(profile.get("command.webrtcvad.speech_sec", ""))
-    if speech_sec:
-        command.extend(["--voice-speech-seconds", speech_sec])
 
-    silence_sec = str(profile.get("command.webrtcvad.silence_sec", ""))
-    if silence_sec:
-        command.extend(["--voice-silence-seconds", silence_sec])
+class _CachedProfile:
+    """Profile view that remembers settings lookups while generating one file"""
 
-    before_sec = str(profile.get("command.webrtcvad.before_sec", ""))
-    if before_sec:
-        command.extend(["--voice-before-seconds", before_sec])
+    def __init__(self, profile: _AnyProfile):
+        self._profile = profile
+        self._cache: typing.Dict[str, typing.Any] = {}
 
-    vad_mode = str(profile.get("command.webrtcvad.vad_mode", ""))
-    if vad_mode:
-        command.extend(["--voice-sensitivity", vad_mode])
+        self.name: str = profile.name
+        self.user_profiles_dir: Path = profile.user_profiles_dir
 
-    silence_method = str(profile.get("command.webrtcvad.silence_method", ""))
-    if silence_method:
-        command.extend(["--voice-silence-method", silence_method])
+    def get(self, path: str, default: typing.Any = None) -> typing.Any:
+        """Get setting by path."""
+        value = self._cache.get(path, _MISSING)
+        if value is _MISSING:
+            value = self._profile.get(path, _MISSING)
+            self._cache[path] = value
 
-    current_energy_threshold = str(
-        profile.get("command.webrtcvad.current_energy_threshold", "")
-    )
-    if current_energy_threshold:
-        command.extend(["--voice-current-energy-threshold", current_energy_threshold])
+        return default if value is _MISSING else value
+
+    def read_path(self, *path_parts: str) -> Path:
+        """Get first readable path in user then system directories."""
+        return self._profile.read_path(*path_parts)
+
+
+class MqttSettings(typing.NamedTuple):
+    """MQTT connection settings, in the argument order of get_*/print_*/compose_*"""
+
+    mqtt_host: str = "localhost"
+    mqtt_port: int = 1883
+    mqtt_username: str = ""
+    mqtt_password: str = ""
+
+
+def get_mqtt_settings(
+    profile: _AnyProfile, local_mqtt_port: int, local_mqtt_host: str = "localhost"
+) -> typing.Tuple[MqttSettings, bool]:
+    """Get MQTT connection settings and whether a remote broker is used."""
+    mqtt_host = str(profile.get("mqtt.host", "localhost"))
+
+    try:
+        mqtt_port = int(profile.get("mqtt.port", 1883))
+    except ValueError:
+        mqtt_port = 1883
 
-    max_energy = str(profile.get("command.webrtcvad.max_energy", ""))
-    if max_energy:
-        command.extend(["--voice-max-energy", max_energy])
+    mqtt_username = str(profile.get("mqtt.username", "")).strip()
+    mqtt_password = str(profile.get("mqtt.password", "")).strip()
+
+    remote_mqtt = str(profile.get("mqtt.enabled", False)).lower() == "true"
+    if not remote_mqtt:
+        # Use internal broker (mosquitto) on custom port
+        mqtt_host = local_mqtt_host
+        mqtt_port = local_mqtt_port
+        mqtt_username = ""
+        mqtt_password = ""
 
-    max_current_energy_ratio_threshold = str(
-        profile.get("command.webrtcvad.max_current_energy_ratio_threshold", "")
+    mqtt_settings = MqttSettings(
+        mqtt_host=mqtt_host,
+        mqtt_port=mqtt_port,
+        mqtt_username=mqtt_username,
+        mqtt_password=mqtt_password,
     )
-    if max_current_energy_ratio_threshold:
-        command.extend(
-            [
-                "--voice-max-current-energy-ratio-threshold",
-                max_current_energy_ratio_threshold,
-            ]
-        )
+
+    return mqtt_settings, remote_mqtt
 
 
 def command_args(
@@ -3573,9 +3723,19 @@ def command_args(
     return []
 
 
+def quote_command(command: typing.Iterable[typing.Any]) -> str:
+    """Join a command and quote it as a single shell argument."""
+    return shlex.quote(" ".join(str(v) for v in command))
+
+
 # -----------------------------------------------------------------------------
 
 
-def write_path(profile: Profile, *path_parts) -> Path:
+def write_path(profile: _AnyProfile, *path_parts) -> Path:
     """Get user writable path in profile."""
     return profile.user_profiles_dir.joinpath(profile.name, *path_parts)
+
+
+def quote_path(profile: _AnyProfile, *path_parts) -> str:
+    """Get user writable path in profile, quoted for the shell."""
+    return shlex.quote(str(write_path(profile, *path_parts)))
@@ -1,12 +1,14 @@
 """Command-line interface to rhasspysupervisor"""
 import argparse
+import contextlib
+import functools
 import logging
+import os
+import shutil
+import tempfile
+import typing
 from pathlib import Path
 
-from rhasspyprofile import Profile
-
-from . import profile_to_conf, profile_to_docker
-
 _LOGGER = logging.getLogger("rhasspysupervisor")
 
 # -----------------------------------------------------------------------------
@@ -14,43 +16,7 @@ _LOGGER = logging.getLogger("rhasspysupervisor")
 
 def main():
     """Main method"""
-    parser = argparse.ArgumentParser("rhasspysupervisor")
-    parser.add_argument(
-        "--profile", "-p", required=True, type=str, help="Name of profile to load"
-    )
-    parser.add_argument(
-        "--system-profiles",
-        help="Directory with base profile files (read only, default=bundled)",
-    )
-    parser.add_argument(
-        "--user-profiles",
-        help="Directory with user profile files (read/write, default=$HOME/.config/rhasspy/profiles)",
-    )
-    parser.add_argument(
-        "--supervisord-conf",
-        default="supervisord.conf",
-        help="Name of supervisord configuration file to write in profile (default: supervisord.conf)",
-    )
-    parser.add_argument(
-        "--docker-compose",
-        default="docker-compose.yml",
-        help="Name of docker-compose YAML file to write in profile (default: docker-compose.yml)",
-    )
-    parser.add_argument(
-        "--local-mqtt-port",
-        type=int,
-        default=12183,
-        help="Port to use for internal MQTT broker (default: 12183)",
-    )
-    parser.add_argument(
-        "--mosquitto-path",
-        default="mosquitto",
-        help="Path to mosquitto binary (default: mosquitto)",
-    )
-    parser.add_argument(
-        "--debug", action="store_true", help="Print DEBUG message to console"
-    )
-    args = parser.parse_args()
+    args = get_parser().parse_args()
 
     if args.debug:
         logging.basicConfig(level=logging.DEBUG)
@@ -64,6 +30,11 @@ def main():
 
     _LOGGER.debug(args)
 
+    # Delay imports until arguments are valid (faster --help and usage errors)
+    from rhasspyprofile import Profile
+
+    from . import profile_to_conf, profile_to_docker
+
     # Load profile
     _LOGGER.debug(
         "Loading profile %s (user=%s, system=%s)",
@@ -81,7 +52,7 @@ def main():
         supervisord_conf_path.parent.mkdir(parents=True, exist_ok=True)
 
         _LOGGER.debug("Generating supervisord conf")
-        with open(supervisord_conf_path, "w") as conf_file:
+        with open_atomic(supervisord_conf_path) as conf_file:
             profile_to_conf(
                 profile,
                 conf_file,
@@ -89,7 +60,7 @@ def main():
                 mosquitto_path=args.mosquitto_path,
             )
 
-        _LOGGER.debug("Wrote %s", str(supervisord_conf_path))
+        _LOGGER.debug("Wrote %s", supervisord_conf_path)
 
     # Convert to docker compose
     if args.docker_compose:
@@ -97,10 +68,84 @@ def main():
         docker_compose_path.parent.mkdir(parents=True, exist_ok=True)
 
         _LOGGER.debug("Generating docker compose YAML")
-        with open(docker_compose_path, "w") as yml_file:
+        with open_atomic(docker_compose_path) as yml_file:
             profile_to_docker(profile, yml_file, local_mqtt_port=args.local_mqtt_port)
 
-        _LOGGER.debug("Wrote %s", str(docker_compose_path))
+        _LOGGER.debug("Wrote %s", docker_compose_path)
+
+
+@contextlib.contextmanager
+def open_atomic(path: Path) -> typing.Iterator[typing.TextIO]:
+    """Write to a temporary file that only replaces path if writing succeeds"""
+    # Write through symlinks, and stay in the same directory as the target so
+    # os.replace is an atomic rename.
+    path = path.resolve()
+    temp_fd, temp_name = tempfile.mkstemp(
+        dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+    )
+    temp_path = Path(temp_name)
+
+    try:
+        with open(temp_fd, "w") as temp_file:
+            yield temp_file
+
+        if path.exists():
+            # Keep permissions of the file being replaced
+            shutil.copymode(path, temp_path)
+        else:
+            # mkstemp creates files as 0600; use the usual mode for new files
+            umask = os.umask(0)
+            os.umask(umask)
+            temp_path.chmod(0o666 & ~umask)
+
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            # Writing failed; leave the previous file in place
+            temp_path.unlink()
+
+
+@functools.lru_cache(maxsize=1)
+def get_parser() -> argparse.ArgumentParser:
+    """Get command-line argument parser (built once)"""
+    parser = argparse.ArgumentParser("rhasspysupervisor")
+    parser.add_argument(
+        "--profile", "-p", required=True, type=str, help="Name of profile to load"
+    )
+    parser.add_argument(
+        "--system-profiles",
+        help="Directory with base profile files (read only, default=bundled)",
+    )
+    parser.add_argument(
+        "--user-profiles",
+        help="Directory with user profile files (read/write, default=$HOME/.config/rhasspy/profiles)",
+    )
+    parser.add_argument(
+        "--supervisord-conf",
+        default="supervisord.conf",
+        help="Name of supervisord configuration file to write in profile (default: supervisord.conf)",
+    )
+    parser.add_argument(
+        "--docker-compose",
+        default="docker-compose.yml",
+        help="Name of docker-compose YAML file to write in profile (default: docker-compose.yml)",
+    )
+    parser.add_argument(
+        "--local-mqtt-port",
+        type=int,
+        default=12183,
+        help="Port to use for internal MQTT broker (default: 12183)",
+    )
+    parser.add_argument(
+        "--mosquitto-path",
+        default="mosquitto",
+        help="Path to mosquitto binary (default: mosquitto)",
+    )
+    parser.add_argument(
+        "--debug", action="store_true", help="Print DEBUG message to console"
+    )
+
+    return parser
 
 
 # -----------------------------------------------------------------------------
@@ -1 +1,21 @@
 #!/usr/bin/env bash
+set -e
+
+# Directory of *this* script
+this_dir="$( cd "$( dirname "$0" )" && pwd )"
+src_dir="$(realpath "${this_dir}/..")"
+
+venv="${src_dir}/.venv"
+if [[ -d "${venv}" ]]; then
+    echo "Using virtual environment at ${venv}"
+    source "${venv}/bin/activate"
+fi
+
+# -----------------------------------------------------------------------------
+
+cd "${src_dir}"
+python3 -m unittest discover -s tests
+
+# -----------------------------------------------------------------------------
+
+echo "OK"
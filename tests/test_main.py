@@ -0,0 +1,74 @@
+"""Tests for command-line interface"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from rhasspysupervisor.__main__ import open_atomic
+
+
+class OpenAtomicTestCase(unittest.TestCase):
+    """Tests for open_atomic"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dir_path = Path(self.temp_dir.name)
+        self.conf_path = self.dir_path / "supervisord.conf"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_replace(self):
+        """Test that the file is replaced and no temporary file is left"""
+        self.conf_path.write_text("old")
+
+        with open_atomic(self.conf_path) as conf_file:
+            conf_file.write("new")
+
+        self.assertEqual(self.conf_path.read_text(), "new")
+        self.assertEqual(list(self.dir_path.iterdir()), [self.conf_path])
+
+    def test_leftover_temp_file(self):
+        """Test that a temporary file from a killed run doesn't block writing"""
+        leftover_path = self.dir_path / f".supervisord.conf.{os.getpid()}.tmp"
+        leftover_path.write_text("partial")
+
+        for _ in range(2):
+            with open_atomic(self.conf_path) as conf_file:
+                conf_file.write("new")
+
+        self.assertEqual(self.conf_path.read_text(), "new")
+        self.assertEqual(leftover_path.read_text(), "partial")
+
+    def test_keep_mode(self):
+        """Test that permissions of the replaced file are kept"""
+        self.conf_path.write_text("old")
+        self.conf_path.chmod(0o640)
+
+        with open_atomic(self.conf_path) as conf_file:
+            conf_file.write("new")
+
+        self.assertEqual(self.conf_path.stat().st_mode & 0o777, 0o640)
+
+    def test_new_file_mode(self):
+        """Test that new files get the usual umask-based mode"""
+        umask = os.umask(0o022)
+        try:
+            with open_atomic(self.conf_path) as conf_file:
+                conf_file.write("new")
+        finally:
+            os.umask(umask)
+
+        self.assertEqual(self.conf_path.stat().st_mode & 0o777, 0o644)
+
+    def test_failure(self):
+        """Test that the previous file is kept if writing fails"""
+        self.conf_path.write_text("old")
+
+        with self.assertRaises(RuntimeError):
+            with open_atomic(self.conf_path) as conf_file:
+                conf_file.write("partial")
+                raise RuntimeError()
+
+        self.assertEqual(self.conf_path.read_text(), "old")
+        self.assertEqual(list(self.dir_path.iterdir()), [self.conf_path])